@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import orjson
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal, AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Audit events are queued in-process and written in batches by one background
+# task, so request handlers never wait on an audit INSERT/commit
+AUDIT_QUEUE_MAX_SIZE = 10000
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 1.0  # seconds
+
+audit_queue: asyncio.Queue = asyncio.Queue(maxsize=AUDIT_QUEUE_MAX_SIZE)
+_flush_task: Optional[asyncio.Task] = None
+
+def record_audit_event(action: str, user_id: Optional[int] = None,
+                       resource_type: Optional[str] = None, resource_id: Optional[int] = None,
+                       details: Optional[Dict[str, Any]] = None, ip_address: Optional[str] = None):
+    """
+    Queue an audit log entry without blocking the caller.
+    
+    Args:
+        action: Action name, e.g. issue_status_updated
+        user_id: Acting user ID
+        resource_type: Type of the affected resource (issue, customer, conversation)
+        resource_id: ID of the affected resource
+        details: Action details, stored as JSON
+        ip_address: Client IP address
+    """
+    event = {
+        "user_id": user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "details": orjson.dumps(details).decode() if details is not None else None,
+        "ip_address": ip_address,
+        # Stamped here rather than by the server, since rows are written late
+        "created_at": datetime.utcnow()
+    }
+    try:
+        audit_queue.put_nowait(event)
+    except asyncio.QueueFull:
+        logger.error(f"Audit queue full, dropping event: {action}")
+
+async def _write_audit_batch(batch: List[Dict[str, Any]]):
+    """Insert a batch of audit events in one statement"""
+    try:
+        async with SessionLocal() as db:
+            await db.execute(insert(AuditLog), batch)
+            await db.commit()
+    except Exception as e:
+        logger.error(f"Error writing {len(batch)} audit events: {str(e)}")
+
+async def flush_audit_loop():
+    """Write queued audit events every AUDIT_BATCH_SIZE rows or AUDIT_FLUSH_INTERVAL"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await audit_queue.get()]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+        try:
+            while len(batch) < AUDIT_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(audit_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Shutting down; don't lose the events already taken off the queue
+            await _write_audit_batch(batch)
+            raise
+        await _write_audit_batch(batch)
+
+def start_audit_flusher():
+    """Start the background audit writer"""
+    global _flush_task
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(flush_audit_loop())
+
+async def stop_audit_flusher():
+    """Stop the background audit writer and write out anything still queued"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    
+    batch = []
+    while not audit_queue.empty():
+        batch.append(audit_queue.get_nowait())
+        if len(batch) >= AUDIT_BATCH_SIZE:
+            await _write_audit_batch(batch)
+            batch = []
+    if batch:
+        await _write_audit_batch(batch)
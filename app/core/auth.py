@@ -1,60 +1,159 @@
-import jwt
+import bcrypt
+import hashlib
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import orjson
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, Tuple
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db, User
-from app.core.cache import cache_get, cache_set
+from app.core.cache import cache_get_json, cache_set_json
+
+# Prefer the Rust-backed JWT implementation; it exposes the same encode/decode
+# API as PyJWT, which remains the fallback for development environments.
+try:
+    import jwt_rs as jwt
+except ImportError:
+    import jwt
 
 logger = logging.getLogger(__name__)
 
+# Auth settings read on every token operation, bound once at import
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHM = settings.ALGORITHM
+_TOKEN_TTL_MIN = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+_TOKEN_TTL_SEC = _TOKEN_TTL_MIN * 60
+
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = 12
 
 # JWT token security
 security = HTTPBearer()
 
+# Roles allowed through the role-gated dependencies
+SUPPORT_ROLES = frozenset({"support_executive", "senior_support", "support_manager"})
+ADMIN_ROLES = frozenset({"admin", "support_manager"})
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Authenticated user resolved from a bearer token"""
+    id: int
+    username: str
+    email: str
+    role: str
+    is_active: bool
+
+# Short-lived cache of bcrypt verification results so repeated logins skip the
+# deliberately slow key expansion. Keys are keyed BLAKE2b digests, never the
+# plain password itself.
+PASSWORD_VERIFY_CACHE_TTL = 60  # seconds
+PASSWORD_VERIFY_CACHE_MAX_ENTRIES = 10000
+_password_verify_cache: Dict[bytes, Tuple[bool, float]] = {}
+_password_verify_lock = threading.Lock()
+_PASSWORD_CACHE_SECRET = _SECRET_KEY.encode()[:64]
+
+def _password_cache_key(plain_password: str, hashed_password: str) -> bytes:
+    """Build the cache key for a password verification"""
+    return hashlib.blake2b(
+        plain_password.encode() + b"|" + hashed_password.encode(),
+        key=_PASSWORD_CACHE_SECRET,
+        digest_size=16
+    ).digest()
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    key = _password_cache_key(plain_password, hashed_password)
+    now = time.monotonic()
+    
+    with _password_verify_lock:
+        cached = _password_verify_cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+    
+    try:
+        result = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Malformed stored hash
+        result = False
+    
+    with _password_verify_lock:
+        if len(_password_verify_cache) >= PASSWORD_VERIFY_CACHE_MAX_ENTRIES:
+            # Drop expired entries first, then the oldest if still full
+            for stale_key in [k for k, (_, expiry) in _password_verify_cache.items() if expiry <= now]:
+                del _password_verify_cache[stale_key]
+            if len(_password_verify_cache) >= PASSWORD_VERIFY_CACHE_MAX_ENTRIES:
+                del _password_verify_cache[next(iter(_password_verify_cache))]
+        _password_verify_cache[key] = (result, now + PASSWORD_VERIFY_CACHE_TTL)
+    
+    return result
+
+# Verified tokens are cached by digest, in Redis for the token's remaining
+# lifetime and per worker for at most LOCAL_TOKEN_CACHE_TTL, so repeat
+# requests skip the signature check and the user lookup.
+LOCAL_TOKEN_CACHE_TTL = 30  # seconds
+LOCAL_TOKEN_CACHE_MAX_ENTRIES = 10000
+_local_token_cache: Dict[str, Tuple[CurrentUser, float]] = {}
+_local_token_lock = threading.Lock()
+
+def _token_cache_key(token: str) -> str:
+    """Build the cache key for a bearer token"""
+    return "jwt:" + hashlib.sha256(token.encode()).hexdigest()[:32]
+
+def _get_local_token_user(cache_key: str) -> Optional[CurrentUser]:
+    """Return the worker-cached user for a token if still fresh"""
+    with _local_token_lock:
+        cached = _local_token_cache.get(cache_key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+    return None
+
+def _set_local_token_user(cache_key: str, user_info: CurrentUser, ttl: float):
+    """Cache a verified user in this worker, never past the token's expiry"""
+    now = time.monotonic()
+    with _local_token_lock:
+        if len(_local_token_cache) >= LOCAL_TOKEN_CACHE_MAX_ENTRIES:
+            for stale_key in [k for k, (_, expiry) in _local_token_cache.items() if expiry <= now]:
+                del _local_token_cache[stale_key]
+            if len(_local_token_cache) >= LOCAL_TOKEN_CACHE_MAX_ENTRIES:
+                del _local_token_cache[next(iter(_local_token_cache))]
+        _local_token_cache[cache_key] = (user_info, now + min(ttl, LOCAL_TOKEN_CACHE_TTL))
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    ttl_seconds = int(expires_delta.total_seconds()) if expires_delta else _TOKEN_TTL_SEC
+    to_encode["exp"] = int(time.time()) + ttl_seconds
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """Verify JWT token and return payload"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _SECRET_KEY, algorithms=[_ALGORITHM])
         return payload
     except jwt.ExpiredSignatureError:
         logger.warning("Token expired")
         return None
-    except jwt.JWTError as e:
+    except jwt.InvalidTokenError as e:
         logger.error(f"JWT verification error: {str(e)}")
         return None
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
     """
     Get current authenticated user from JWT token.
     
@@ -63,19 +162,33 @@ async def get_current_user(
         db: Database session
         
     Returns:
-        User information dictionary
+        Authenticated user
         
     Raises:
         HTTPException: If authentication fails
     """
     try:
         token = credentials.credentials
+        cache_key = _token_cache_key(token)
         
-        # Check cache first
-        cache_key = f"user_token:{token}"
-        cached_user = cache_get(cache_key)
-        if cached_user:
-            return cached_user
+        # Check process-local cache, then Redis
+        local_user = _get_local_token_user(cache_key)
+        if local_user:
+            return local_user
+        
+        cached = await cache_get_json(cache_key)
+        if cached:
+            if cached.get("revoked"):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            remaining = cached["exp"] - time.time()
+            if remaining > 0:
+                user_info = CurrentUser(**cached["user"])
+                _set_local_token_user(cache_key, user_info, remaining)
+                return user_info
         
         # Verify token
         payload = verify_token(token)
@@ -95,7 +208,7 @@ async def get_current_user(
             )
         
         # Get user from database
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -111,16 +224,19 @@ async def get_current_user(
             )
         
         # Prepare user info
-        user_info = {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "role": user.role,
-            "is_active": user.is_active
-        }
+        user_info = CurrentUser(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active
+        )
         
-        # Cache user info for 5 minutes
-        cache_set(cache_key, user_info, ttl=300)
+        # Cache the verified user until the token expires
+        remaining = payload["exp"] - time.time()
+        if remaining > 0:
+            await cache_set_json(cache_key, {"user": asdict(user_info), "exp": payload["exp"]}, ttl=int(remaining) or 1)
+            _set_local_token_user(cache_key, user_info, remaining)
         
         return user_info
         
@@ -134,9 +250,36 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+async def revoke_token(token: str) -> bool:
+    """
+    Revoke a bearer token until it expires.
+    
+    The Redis entry is replaced with a revocation marker so every worker
+    rejects the token; other workers may still serve it from their local
+    cache for up to LOCAL_TOKEN_CACHE_TTL seconds.
+    
+    Args:
+        token: Encoded JWT
+        
+    Returns:
+        True if the token was valid and is now revoked, False otherwise
+    """
+    payload = verify_token(token)
+    if not payload:
+        return False
+    
+    cache_key = _token_cache_key(token)
+    with _local_token_lock:
+        _local_token_cache.pop(cache_key, None)
+    
+    remaining = int(payload["exp"] - time.time())
+    if remaining <= 0:
+        return True
+    return await cache_set_json(cache_key, {"revoked": True}, ttl=remaining)
+
 async def get_current_active_user(
-    current_user: Dict[str, Any] = Depends(get_current_user)
-) -> Dict[str, Any]:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """
     Get current active user.
     
@@ -146,7 +289,7 @@ async def get_current_active_user(
     Returns:
         Active user information
     """
-    if not current_user.get("is_active"):
+    if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
@@ -154,8 +297,8 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_support_user(
-    current_user: Dict[str, Any] = Depends(get_current_user)
-) -> Dict[str, Any]:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """
     Get current support user (with support role).
     
@@ -165,7 +308,7 @@ async def get_current_support_user(
     Returns:
         Support user information
     """
-    if current_user.get("role") not in ["support_executive", "senior_support", "support_manager"]:
+    if current_user.role not in SUPPORT_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Insufficient permissions"
@@ -173,8 +316,8 @@ async def get_current_support_user(
     return current_user
 
 async def get_current_admin_user(
-    current_user: Dict[str, Any] = Depends(get_current_user)
-) -> Dict[str, Any]:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """
     Get current admin user.
     
@@ -184,14 +327,14 @@ async def get_current_admin_user(
     Returns:
         Admin user information
     """
-    if current_user.get("role") not in ["admin", "support_manager"]:
+    if current_user.role not in ADMIN_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     return current_user
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """
     Authenticate user with username and password.
     
@@ -204,16 +347,18 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         User object if authentication successful, None otherwise
     """
     try:
-        user = db.query(User).filter(User.username == username).first()
+        user = await get_user_by_username(db, username)
         if not user:
             return None
         
         if not verify_password(password, user.hashed_password):
             return None
         
-        # Update last login
-        user.last_login = datetime.utcnow()
-        db.commit()
+        # Update last login with a single UPDATE stamped by the DB clock, like
+        # update_user_last_login. MySQL has no RETURNING, so the returned
+        # user keeps its previously loaded last_login.
+        await db.execute(update(User).where(User.id == user.id).values(last_login=func.utc_timestamp()))
+        await db.commit()
         
         return user
         
@@ -221,7 +366,7 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         logger.error(f"Authentication error: {str(e)}")
         return None
 
-def create_user(db: Session, username: str, email: str, password: str, role: str = "support_executive") -> User:
+async def create_user(db: AsyncSession, username: str, email: str, password: str, role: str = "support_executive") -> User:
     """
     Create a new user.
     
@@ -247,38 +392,38 @@ def create_user(db: Session, username: str, email: str, password: str, role: str
         )
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         return user
         
     except Exception as e:
         logger.error(f"Error creating user: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise
 
-def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     """Get user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    return await db.get(User, user_id)
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """Get user by username"""
-    return db.query(User).filter(User.username == username).first()
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email"""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def update_user_last_login(db: Session, user_id: int):
+async def update_user_last_login(db: AsyncSession, user_id: int):
     """Update user's last login timestamp"""
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            user.last_login = datetime.utcnow()
-            db.commit()
+        await db.execute(update(User).where(User.id == user_id).values(last_login=func.utc_timestamp()))
+        await db.commit()
     except Exception as e:
         logger.error(f"Error updating last login: {str(e)}")
-        db.rollback()
+        await db.rollback()
 
 def validate_api_key(api_key: str) -> bool:
     """
@@ -286,17 +431,9 @@ def validate_api_key(api_key: str) -> bool:
     """
     raise NotImplementedError("API key validation should be implemented for production use.")
 
-def get_user_permissions(user_role: str) -> Dict[str, bool]:
-    """
-    Get user permissions based on role.
-    
-    Args:
-        user_role: User role
-        
-    Returns:
-        Dictionary of permissions
-    """
-    permissions = {
+def _build_role_permissions() -> Dict[str, Dict[str, bool]]:
+    """Build the permission table for every known role"""
+    base_permissions = {
         "view_issues": True,
         "create_issues": True,
         "update_issues": True,
@@ -307,26 +444,60 @@ def get_user_permissions(user_role: str) -> Dict[str, bool]:
         "system_admin": False
     }
     
-    if user_role == "admin":
-        permissions.update({
+    role_overrides = {
+        "admin": {
             "delete_issues": True,
             "view_analytics": True,
             "manage_users": True,
             "system_admin": True
-        })
-    elif user_role == "support_manager":
-        permissions.update({
+        },
+        "support_manager": {
             "view_analytics": True,
             "manage_users": True
-        })
-    elif user_role == "senior_support":
-        permissions.update({
+        },
+        "senior_support": {
             "view_analytics": True
-        })
+        },
+        "support_executive": {}
+    }
+    
+    return {role: {**base_permissions, **overrides} for role, overrides in role_overrides.items()}
+
+# Permissions per role (read-only) and their JSON encoding, computed once at import
+PERMISSIONS_BY_ROLE = {
+    role: MappingProxyType(permissions) for role, permissions in _build_role_permissions().items()
+}
+PERMISSIONS_JSON_BY_ROLE = {
+    role: orjson.dumps(dict(permissions)) for role, permissions in PERMISSIONS_BY_ROLE.items()
+}
+DEFAULT_ROLE = "support_executive"
+DEFAULT_PERMISSIONS = PERMISSIONS_BY_ROLE[DEFAULT_ROLE]
+
+def get_user_permissions(user_role: str) -> Mapping[str, bool]:
+    """
+    Get user permissions based on role.
     
-    return permissions
+    Args:
+        user_role: User role
+        
+    Returns:
+        Read-only mapping of permissions
+    """
+    return PERMISSIONS_BY_ROLE.get(user_role, DEFAULT_PERMISSIONS)
+
+def get_user_permissions_json(user_role: str) -> bytes:
+    """
+    Get user permissions based on role, pre-serialized as JSON.
+    
+    Args:
+        user_role: User role
+        
+    Returns:
+        JSON-encoded permissions, ready to write to the cache
+    """
+    return PERMISSIONS_JSON_BY_ROLE.get(user_role, PERMISSIONS_JSON_BY_ROLE[DEFAULT_ROLE])
 
-def check_permission(user: Dict[str, Any], permission: str) -> bool:
+def check_permission(user: CurrentUser, permission: str) -> bool:
     """
     Check if user has specific permission.
     
@@ -337,5 +508,5 @@ def check_permission(user: Dict[str, Any], permission: str) -> bool:
     Returns:
         True if user has permission, False otherwise
     """
-    permissions = get_user_permissions(user.get("role", "support_executive"))
+    permissions = PERMISSIONS_BY_ROLE.get(user.role or DEFAULT_ROLE, DEFAULT_PERMISSIONS)
     return permissions.get(permission, False) 
\ No newline at end of file
@@ -1,17 +1,82 @@
-import json
+import base64
+import functools
 import logging
-from typing import Optional, Any, Dict
-import redis
+import threading
+import time
+import orjson
+from typing import Optional, Any, Callable, Dict, List
+import redis.asyncio as aioredis
+import xxhash
+import zstandard
 from datetime import datetime
+from pydantic import BaseModel
 
-from app.core.config import get_redis_url
+from app.core.config import settings, get_redis_url
 
 logger = logging.getLogger(__name__)
 
-# Redis client
-redis_client = redis.from_url(get_redis_url(), decode_responses=True)
+# Redis connection pool (bounded, with keepalive so bursts reuse connections)
+redis_pool = aioredis.BlockingConnectionPool.from_url(
+    get_redis_url(),
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    timeout=settings.REDIS_POOL_TIMEOUT,
+    socket_keepalive=True,
+    health_check_interval=30,
+    decode_responses=True
+)
 
-def cache_set(key: str, value: str, ttl: int = 300) -> bool:
+# Redis client
+redis_client = aioredis.Redis(connection_pool=redis_pool)
+
+# JSON payloads at least this large are stored zstd-compressed. The client
+# decodes responses as text, so the frame is base64 encoded behind a prefix
+# that serialized JSON can never start with.
+CACHE_COMPRESS_MIN_BYTES = 512
+_COMPRESSED_PREFIX = "z:"
+_zstd_compressor = zstandard.ZstdCompressor(level=3)
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+def _dump_json(value: Any):
+    """Serialize a value for the cache, compressing large payloads"""
+    data = orjson.dumps(value)
+    if len(data) < CACHE_COMPRESS_MIN_BYTES:
+        return data
+    return _COMPRESSED_PREFIX + base64.b64encode(_zstd_compressor.compress(data)).decode("ascii")
+
+def _load_json(value: str) -> Any:
+    """Deserialize a cached value written by _dump_json"""
+    if value.startswith(_COMPRESSED_PREFIX):
+        return orjson.loads(_zstd_decompressor.decompress(base64.b64decode(value[len(_COMPRESSED_PREFIX):])))
+    return orjson.loads(value)
+
+# Batch size for SCAN iteration and UNLINK calls
+SCAN_BATCH_SIZE = 500
+
+# Atomic INCR that only sets the TTL on the first increment, so a counter's
+# window is not extended by later hits. Runs via EVALSHA after the first call.
+_incr_expire_script = redis_client.register_script(
+    "local v = redis.call('INCRBY', KEYS[1], ARGV[1]) "
+    "if v == tonumber(ARGV[1]) then redis.call('EXPIRE', KEYS[1], ARGV[2]) end "
+    "return v"
+)
+
+# Claims a batch of rate-limit slots for the current window and returns the
+# new counter value together with the window's remaining TTL in milliseconds.
+_rate_limit_claim_script = redis_client.register_script(
+    "local v = redis.call('INCRBY', KEYS[1], ARGV[1]) "
+    "if v == tonumber(ARGV[1]) then redis.call('EXPIRE', KEYS[1], ARGV[2]) end "
+    "return {v, redis.call('PTTL', KEYS[1])}"
+)
+
+# Number of requests a worker claims from Redis at once when rate limiting
+RATE_LIMIT_LOCAL_BATCH = 10
+
+# Per-worker rate-limit budgets: key -> [remaining, window_expiry]
+RATE_LIMIT_LOCAL_MAX_ENTRIES = 10000
+_rate_limit_local: Dict[str, List[float]] = {}
+_rate_limit_lock = threading.Lock()
+
+async def cache_set(key: str, value: str, ttl: int = 300) -> bool:
     """
     Set cache value with TTL.
     
@@ -24,13 +89,13 @@ def cache_set(key: str, value: str, ttl: int = 300) -> bool:
         True if successful, False otherwise
     """
     try:
-        redis_client.setex(key, ttl, value)
+        await redis_client.setex(key, ttl, value)
         return True
     except Exception as e:
         logger.error(f"Cache set error for key {key}: {str(e)}")
         return False
 
-def cache_get(key: str) -> Optional[str]:
+async def cache_get(key: str) -> Optional[str]:
     """
     Get cache value.
     
@@ -41,12 +106,12 @@ def cache_get(key: str) -> Optional[str]:
         Cached value or None if not found
     """
     try:
-        return redis_client.get(key)
+        return await redis_client.get(key)
     except Exception as e:
         logger.error(f"Cache get error for key {key}: {str(e)}")
         return None
 
-def cache_delete(key: str) -> bool:
+async def cache_delete(key: str) -> bool:
     """
     Delete cache value.
     
@@ -57,13 +122,32 @@ def cache_delete(key: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        redis_client.delete(key)
+        await redis_client.delete(key)
         return True
     except Exception as e:
         logger.error(f"Cache delete error for key {key}: {str(e)}")
         return False
 
-def cache_set_json(key: str, value: Dict[str, Any], ttl: int = 300) -> bool:
+async def cache_delete_many(keys: List[str]) -> bool:
+    """
+    Delete several cache values in one round trip.
+    
+    Args:
+        keys: Cache keys
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    if not keys:
+        return True
+    try:
+        await redis_client.unlink(*keys)
+        return True
+    except Exception as e:
+        logger.error(f"Cache delete error for keys {keys}: {str(e)}")
+        return False
+
+async def cache_set_json(key: str, value: Dict[str, Any], ttl: int = 300) -> bool:
     """
     Set JSON cache value with TTL.
     
@@ -76,13 +160,13 @@ def cache_set_json(key: str, value: Dict[str, Any], ttl: int = 300) -> bool:
         True if successful, False otherwise
     """
     try:
-        json_value = json.dumps(value)
-        return cache_set(key, json_value, ttl)
+        await redis_client.setex(key, ttl, _dump_json(value))
+        return True
     except Exception as e:
         logger.error(f"Cache set JSON error for key {key}: {str(e)}")
         return False
 
-def cache_get_json(key: str) -> Optional[Dict[str, Any]]:
+async def cache_get_json(key: str) -> Optional[Dict[str, Any]]:
     """
     Get JSON cache value.
     
@@ -93,15 +177,96 @@ def cache_get_json(key: str) -> Optional[Dict[str, Any]]:
         Cached dictionary or None if not found
     """
     try:
-        value = cache_get(key)
-        if value:
-            return json.loads(value)
-        return None
+        value = await redis_client.get(key)
+        return _load_json(value) if value else None
     except Exception as e:
         logger.error(f"Cache get JSON error for key {key}: {str(e)}")
         return None
 
-def cache_exists(key: str) -> bool:
+async def cache_mget(keys: List[str]) -> List[Optional[str]]:
+    """
+    Get several cache values with a single MGET.
+    
+    Args:
+        keys: Cache keys
+        
+    Returns:
+        Cached values in key order, None for missing keys
+    """
+    if not keys:
+        return []
+    try:
+        return await redis_client.mget(keys)
+    except Exception as e:
+        logger.error(f"Cache mget error for keys {keys}: {str(e)}")
+        return [None] * len(keys)
+
+async def cache_mset(mapping: Dict[str, str], ttl: int = 300) -> bool:
+    """
+    Set several cache values with TTL in a single round trip.
+    
+    Args:
+        mapping: Dictionary of cache key to value
+        ttl: Time to live in seconds
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    if not mapping:
+        return True
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.setex(key, ttl, value)
+        await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error(f"Cache mset error for keys {list(mapping)}: {str(e)}")
+        return False
+
+async def cache_mget_json(keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Get several JSON cache values with a single MGET.
+    
+    Args:
+        keys: Cache keys
+        
+    Returns:
+        Cached dictionaries in key order, None for missing keys
+    """
+    if not keys:
+        return []
+    try:
+        values = await redis_client.mget(keys)
+        return [_load_json(value) if value else None for value in values]
+    except Exception as e:
+        logger.error(f"Cache mget JSON error for keys {keys}: {str(e)}")
+        return [None] * len(keys)
+
+async def cache_mset_json(mapping: Dict[str, Dict[str, Any]], ttl: int = 300) -> bool:
+    """
+    Set several JSON cache values with TTL in a single round trip.
+    
+    Args:
+        mapping: Dictionary of cache key to dictionary value
+        ttl: Time to live in seconds
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    if not mapping:
+        return True
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.setex(key, ttl, _dump_json(value))
+        await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error(f"Cache mset JSON error for keys {list(mapping)}: {str(e)}")
+        return False
+
+async def cache_exists(key: str) -> bool:
     """
     Check if cache key exists.
     
@@ -112,12 +277,12 @@ def cache_exists(key: str) -> bool:
         True if key exists, False otherwise
     """
     try:
-        return redis_client.exists(key) > 0
+        return await redis_client.exists(key) > 0
     except Exception as e:
         logger.error(f"Cache exists error for key {key}: {str(e)}")
         return False
 
-def cache_ttl(key: str) -> int:
+async def cache_ttl(key: str) -> int:
     """
     Get remaining TTL for cache key.
     
@@ -128,12 +293,12 @@ def cache_ttl(key: str) -> int:
         Remaining TTL in seconds, -1 if key doesn't exist, -2 if key has no TTL
     """
     try:
-        return redis_client.ttl(key)
+        return await redis_client.ttl(key)
     except Exception as e:
         logger.error(f"Cache TTL error for key {key}: {str(e)}")
         return -1
 
-def cache_increment(key: str, amount: int = 1, ttl: int = 300) -> Optional[int]:
+async def cache_increment(key: str, amount: int = 1, ttl: int = 300) -> Optional[int]:
     """
     Increment cache value (useful for counters).
     
@@ -146,17 +311,12 @@ def cache_increment(key: str, amount: int = 1, ttl: int = 300) -> Optional[int]:
         New value or None if error
     """
     try:
-        # Use Redis pipeline for atomic operation
-        pipe = redis_client.pipeline()
-        pipe.incr(key, amount)
-        pipe.expire(key, ttl)
-        result = pipe.execute()
-        return result[0]
+        return await _incr_expire_script(keys=[key], args=[amount, ttl])
     except Exception as e:
         logger.error(f"Cache increment error for key {key}: {str(e)}")
         return None
 
-def cache_set_hash(key: str, mapping: Dict[str, str], ttl: int = 300) -> bool:
+async def cache_set_hash(key: str, mapping: Dict[str, str], ttl: int = 300) -> bool:
     """
     Set hash cache value.
     
@@ -172,13 +332,13 @@ def cache_set_hash(key: str, mapping: Dict[str, str], ttl: int = 300) -> bool:
         pipe = redis_client.pipeline()
         pipe.hset(key, mapping=mapping)
         pipe.expire(key, ttl)
-        pipe.execute()
+        await pipe.execute()
         return True
     except Exception as e:
         logger.error(f"Cache set hash error for key {key}: {str(e)}")
         return False
 
-def cache_get_hash(key: str) -> Optional[Dict[str, str]]:
+async def cache_get_hash(key: str) -> Optional[Dict[str, str]]:
     """
     Get hash cache value.
     
@@ -189,15 +349,18 @@ def cache_get_hash(key: str) -> Optional[Dict[str, str]]:
         Hash dictionary or None if not found
     """
     try:
-        return redis_client.hgetall(key)
+        return await redis_client.hgetall(key)
     except Exception as e:
         logger.error(f"Cache get hash error for key {key}: {str(e)}")
         return None
 
-def cache_delete_pattern(pattern: str) -> int:
+async def cache_delete_pattern(pattern: str) -> int:
     """
     Delete cache keys matching pattern.
     
+    Uses incremental SCAN and non-blocking UNLINK so large keyspaces do not
+    stall Redis.
+    
     Args:
         pattern: Redis pattern (e.g., "user:*")
         
@@ -205,15 +368,90 @@ def cache_delete_pattern(pattern: str) -> int:
         Number of keys deleted
     """
     try:
-        keys = redis_client.keys(pattern)
-        if keys:
-            return redis_client.delete(*keys)
-        return 0
+        deleted = 0
+        batch = []
+        async for key in redis_client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                deleted += await redis_client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await redis_client.unlink(*batch)
+        return deleted
     except Exception as e:
         logger.error(f"Cache delete pattern error for pattern {pattern}: {str(e)}")
         return 0
 
-def cache_clear_all() -> bool:
+async def cache_tag_key(tag: str, key: str, ttl: int = 300) -> bool:
+    """
+    Record a cache key under a tag index set for targeted invalidation.
+    
+    Args:
+        tag: Tag name (e.g., "issue:123")
+        key: Cache key to record
+        ttl: Time to live of the index set in seconds
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        index_key = f"idx:{tag}"
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.sadd(index_key, key)
+        # A new index takes the key's TTL and an existing one is only ever
+        # extended, so the index outlives every key recorded under it
+        pipe.expire(index_key, ttl, nx=True)
+        pipe.expire(index_key, ttl, gt=True)
+        await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error(f"Cache tag error for key {key}: {str(e)}")
+        return False
+
+async def cache_delete_tag(tag: str) -> int:
+    """
+    Delete all cache keys recorded under a tag, along with the tag index.
+    
+    Args:
+        tag: Tag name (e.g., "issue:123")
+        
+    Returns:
+        Number of cached keys deleted
+    """
+    return await cache_delete_tags([tag])
+
+async def cache_delete_tags(tags: List[str]) -> int:
+    """
+    Delete all cache keys recorded under several tags, along with the tag
+    indexes, in two round trips regardless of the number of tags.
+    
+    Args:
+        tags: Tag names (e.g., ["issue:123", "critical_issues"])
+        
+    Returns:
+        Number of cached keys deleted
+    """
+    if not tags:
+        return 0
+    try:
+        index_keys = [f"idx:{tag}" for tag in tags]
+        pipe = redis_client.pipeline(transaction=False)
+        for index_key in index_keys:
+            pipe.smembers(index_key)
+        members = await pipe.execute()
+        keys = set().union(*members)
+        
+        pipe = redis_client.pipeline(transaction=False)
+        if keys:
+            pipe.unlink(*keys)
+        pipe.unlink(*index_keys)
+        results = await pipe.execute()
+        return results[0] if keys else 0
+    except Exception as e:
+        logger.error(f"Cache delete tag error for tags {tags}: {str(e)}")
+        return 0
+
+async def cache_clear_all() -> bool:
     """
     Clear all cache (use with caution).
     
@@ -221,28 +459,47 @@ def cache_clear_all() -> bool:
         True if successful, False otherwise
     """
     try:
-        redis_client.flushdb()
+        await redis_client.flushdb()
         return True
     except Exception as e:
         logger.error(f"Cache clear all error: {str(e)}")
         return False
 
-def cache_get_stats() -> Dict[str, Any]:
+# Cached cache_get_stats result as (stats, expiry)
+CACHE_STATS_TTL = 5  # seconds
+_cache_stats_snapshot: Optional[tuple] = None
+
+async def cache_get_stats() -> Dict[str, Any]:
     """
     Get cache statistics.
     
+    Only the INFO sections needed are fetched, and the result is reused for
+    a few seconds so frequent monitoring polls don't hit Redis each time.
+    
     Returns:
         Dictionary with cache statistics
     """
+    global _cache_stats_snapshot
+    now = time.monotonic()
+    if _cache_stats_snapshot and _cache_stats_snapshot[1] > now:
+        return dict(_cache_stats_snapshot[0])
+    
     try:
-        info = redis_client.info()
-        return {
-            "total_keys": info.get("db0", {}).get("keys", 0),
-            "memory_used": info.get("used_memory_human", "0B"),
-            "connected_clients": info.get("connected_clients", 0),
-            "uptime_seconds": info.get("uptime_in_seconds", 0),
-            "redis_version": info.get("redis_version", "unknown")
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.info("server")
+        pipe.info("clients")
+        pipe.info("memory")
+        pipe.info("keyspace")
+        server, clients, memory, keyspace = await pipe.execute()
+        stats = {
+            "total_keys": keyspace.get("db0", {}).get("keys", 0),
+            "memory_used": memory.get("used_memory_human", "0B"),
+            "connected_clients": clients.get("connected_clients", 0),
+            "uptime_seconds": server.get("uptime_in_seconds", 0),
+            "redis_version": server.get("redis_version", "unknown")
         }
+        _cache_stats_snapshot = (stats, now + CACHE_STATS_TTL)
+        return dict(stats)
     except Exception as e:
         logger.error(f"Cache stats error: {str(e)}")
         return {}
@@ -252,6 +509,10 @@ def generate_issue_cache_key(issue_id: int) -> str:
     """Generate cache key for issue data"""
     return f"issue:{issue_id}"
 
+def generate_issue_cache_tag(issue_id: int) -> str:
+    """Generate the tag indexing every cache key scoped to an issue"""
+    return f"issue:{issue_id}"
+
 def generate_customer_cache_key(customer_id: int) -> str:
     """Generate cache key for customer data"""
     return f"customer:{customer_id}"
@@ -264,75 +525,191 @@ def generate_analysis_cache_key(issue_id: int, timestamp: float) -> str:
     """Generate cache key for issue analysis"""
     return f"analysis:{issue_id}:{timestamp}"
 
+def generate_issue_analysis_cache_key(customer_id: int, title: str, description: str) -> str:
+    """Generate cache key for the analysis of an issue payload"""
+    payload_hash = xxhash.xxh3_128_hexdigest(f"{title}\0{description}".encode())
+    return f"issue_analysis:{customer_id}:{payload_hash}"
+
 def generate_recommendation_cache_key(issue_id: int) -> str:
     """Generate cache key for recommendations"""
     return f"recommendations:{issue_id}"
 
+def generate_recommendation_response_cache_key(issue_id: int, context: str, issue_version: str) -> str:
+    """Generate cache key for a recommendation response to a given context and issue state"""
+    context_hash = xxhash.xxh3_128_hexdigest(f"{issue_version}\0{context}".encode())
+    return f"recommendations:{issue_id}:{context_hash}"
+
+def generate_similar_issues_cache_key(issue_id: int) -> str:
+    """Generate cache key for an issue's similar resolved issues"""
+    return f"similar_issues:{issue_id}"
+
 def generate_conversation_cache_key(conversation_id: int) -> str:
     """Generate cache key for conversation data"""
     return f"conversation:{conversation_id}"
 
+def generate_api_response_cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Generate cache key for an API response from a hash of its parameters"""
+    param_bytes = orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+    key_hash = xxhash.xxh3_128_hexdigest(endpoint.encode() + b":" + param_bytes)
+    return f"api2:{endpoint}:{key_hash}"
+
 # Cache utilities for specific use cases
-def cache_issue_data(issue_id: int, issue_data: Dict[str, Any], ttl: int = 1800) -> bool:
+async def cache_issue_data(issue_id: int, issue_data: Dict[str, Any], ttl: int = 1800) -> bool:
     """Cache issue data"""
     key = generate_issue_cache_key(issue_id)
-    return cache_set_json(key, issue_data, ttl)
+    if not await cache_set_json(key, issue_data, ttl):
+        return False
+    return await cache_tag_key(generate_issue_cache_tag(issue_id), key, ttl)
 
-def get_cached_issue_data(issue_id: int) -> Optional[Dict[str, Any]]:
+async def get_cached_issue_data(issue_id: int) -> Optional[Dict[str, Any]]:
     """Get cached issue data"""
     key = generate_issue_cache_key(issue_id)
-    return cache_get_json(key)
+    return await cache_get_json(key)
 
-def cache_customer_data(customer_id: int, customer_data: Dict[str, Any], ttl: int = 3600) -> bool:
+# Bumped whenever an issue enters or leaves a resolved status, so workers
+# notice resolved-set changes without querying the issues table
+RESOLVED_INDEX_VERSION_KEY = "resolved_index:version"
+
+async def bump_resolved_index_version() -> Optional[int]:
+    """Advance the shared resolved-issue index version"""
+    try:
+        return await redis_client.incr(RESOLVED_INDEX_VERSION_KEY)
+    except Exception as e:
+        logger.error(f"Resolved index version bump error: {str(e)}")
+        return None
+
+async def cache_customer_data(customer_id: int, customer_data: Dict[str, Any], ttl: int = 3600) -> bool:
     """Cache customer data"""
     key = generate_customer_cache_key(customer_id)
-    return cache_set_json(key, customer_data, ttl)
+    return await cache_set_json(key, customer_data, ttl)
 
-def get_cached_customer_data(customer_id: int) -> Optional[Dict[str, Any]]:
+async def get_cached_customer_data(customer_id: int) -> Optional[Dict[str, Any]]:
     """Get cached customer data"""
     key = generate_customer_cache_key(customer_id)
-    return cache_get_json(key)
+    return await cache_get_json(key)
 
-def cache_user_session(user_id: int, session_data: Dict[str, Any], ttl: int = 1800) -> bool:
+async def cache_user_session(user_id: int, session_data: Dict[str, Any], ttl: int = 1800) -> bool:
     """Cache user session data"""
     key = f"session:user:{user_id}"
-    return cache_set_json(key, session_data, ttl)
+    return await cache_set_json(key, session_data, ttl)
 
-def get_cached_user_session(user_id: int) -> Optional[Dict[str, Any]]:
+async def get_cached_user_session(user_id: int) -> Optional[Dict[str, Any]]:
     """Get cached user session data"""
     key = f"session:user:{user_id}"
-    return cache_get_json(key)
+    return await cache_get_json(key)
 
-def cache_api_response(endpoint: str, params: Dict[str, Any], response: Dict[str, Any], ttl: int = 300) -> bool:
+async def cache_api_response(endpoint: str, params: Dict[str, Any], response: Dict[str, Any], ttl: int = 300) -> bool:
     """Cache API response"""
-    # Create a hash of the endpoint and parameters for the cache key
-    import hashlib
-    param_str = json.dumps(params, sort_keys=True)
-    key_hash = hashlib.md5(f"{endpoint}:{param_str}".encode()).hexdigest()
-    key = f"api:{endpoint}:{key_hash}"
-    return cache_set_json(key, response, ttl)
-
-def get_cached_api_response(endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    key = generate_api_response_cache_key(endpoint, params)
+    return await cache_set_json(key, response, ttl)
+
+async def get_cached_api_response(endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Get cached API response"""
-    import hashlib
-    param_str = json.dumps(params, sort_keys=True)
-    key_hash = hashlib.md5(f"{endpoint}:{param_str}".encode()).hexdigest()
-    key = f"api:{endpoint}:{key_hash}"
-    return cache_get_json(key)
+    key = generate_api_response_cache_key(endpoint, params)
+    return await cache_get_json(key)
 
-def cache_rate_limit(key: str, limit: int, window: int) -> bool:
+async def cache_rate_limit(key: str, limit: int, window: int) -> bool:
     """Cache rate limit counter"""
-    return cache_increment(key, 1, window) is not None
+    return await cache_increment(key, 1, window) is not None
 
-def get_rate_limit_count(key: str) -> int:
+async def get_rate_limit_count(key: str) -> int:
     """Get current rate limit count"""
-    count = cache_get(key)
+    count = await cache_get(key)
     return int(count) if count else 0
 
-def is_rate_limited(key: str, limit: int) -> bool:
-    """Check if request is rate limited"""
-    count = get_rate_limit_count(key)
-    return count >= limit
+async def is_rate_limited(key: str, limit: int, window: int = 60) -> bool:
+    """
+    Consume one request from the rate limit and check whether it is exceeded.
+    
+    Each worker claims slots from the shared Redis counter in batches and
+    serves requests from its local budget until it runs out or the window
+    ends, so most allowed requests never touch Redis.
+    
+    Args:
+        key: Rate limit key
+        limit: Maximum requests per window
+        window: Window length in seconds
+        
+    Returns:
+        True if the request exceeds the limit, False otherwise
+    """
+    now = time.monotonic()
+    with _rate_limit_lock:
+        budget = _rate_limit_local.get(key)
+        if budget and budget[1] > now:
+            if budget[0] > 0:
+                budget[0] -= 1
+                return False
+            if budget[0] < 0:
+                # Window already exhausted in Redis
+                return True
+    
+    batch = max(1, min(RATE_LIMIT_LOCAL_BATCH, limit))
+    try:
+        count, ttl_ms = await _rate_limit_claim_script(keys=[key], args=[batch, window])
+    except Exception as e:
+        logger.error(f"Rate limit claim error for key {key}: {str(e)}")
+        count = await get_rate_limit_count(key)
+        return count >= limit
+    
+    granted = max(0, min(batch, limit - (count - batch)))
+    expiry = now + (ttl_ms / 1000 if ttl_ms > 0 else window)
+    with _rate_limit_lock:
+        if key not in _rate_limit_local and len(_rate_limit_local) >= RATE_LIMIT_LOCAL_MAX_ENTRIES:
+            # Drop ended windows first, then the oldest if still full
+            for stale_key in [k for k, (_, expiry) in _rate_limit_local.items() if expiry <= now]:
+                del _rate_limit_local[stale_key]
+            if len(_rate_limit_local) >= RATE_LIMIT_LOCAL_MAX_ENTRIES:
+                del _rate_limit_local[next(iter(_rate_limit_local))]
+        # Keep one slot for this request; -1 marks an exhausted window
+        _rate_limit_local[key] = [granted - 1, expiry]
+    return granted == 0
+
+# Endpoint response caching
+RESPONSE_CACHE_VERSION = "v1"
+
+def generate_response_cache_key(route: str, key_part: str) -> str:
+    """Generate cache key for a cached endpoint response"""
+    return f"{RESPONSE_CACHE_VERSION}:{route}:{xxhash.xxh3_64_hexdigest(key_part.encode())}"
+
+def cached_response(route: str, ttl: int = 60,
+                    key_builder: Optional[Callable[..., str]] = None,
+                    tag_builder: Optional[Callable[..., str]] = None):
+    """
+    Cache an async endpoint's JSON response in Redis.
+    
+    Args:
+        route: Route name used as the key namespace
+        ttl: Time to live in seconds
+        key_builder: Builds the key part from the endpoint's keyword arguments
+        tag_builder: Builds the invalidation tag from the endpoint's keyword
+            arguments; defaults to the route name
+        
+    Returns:
+        Decorator for the endpoint function
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key_part = key_builder(**kwargs) if key_builder else ""
+            key = generate_response_cache_key(route, key_part)
+            
+            cached = await cache_get_json(key)
+            if cached is not None:
+                return cached
+            
+            response = await func(*args, **kwargs)
+            payload = response.model_dump(mode="json") if isinstance(response, BaseModel) else response
+            if await cache_set_json(key, payload, ttl):
+                tag = tag_builder(**kwargs) if tag_builder else route
+                await cache_tag_key(tag, key, ttl)
+            return response
+        return wrapper
+    return decorator
+
+async def invalidate_cached_responses(*tags: str) -> int:
+    """Invalidate all cached endpoint responses recorded under the given tags"""
+    return await cache_delete_tags(list(tags))
 
 # Cache cleanup utilities
 def cleanup_expired_cache():
@@ -346,22 +723,21 @@ def cleanup_expired_cache():
         logger.error(f"Cache cleanup error: {str(e)}")
         return False
 
-def clear_user_cache(user_id: int):
+async def clear_user_cache(user_id: int):
     """Clear all cache entries for a specific user"""
     try:
         pattern = f"*user:{user_id}*"
-        deleted_count = cache_delete_pattern(pattern)
+        deleted_count = await cache_delete_pattern(pattern)
         logger.info(f"Cleared {deleted_count} cache entries for user {user_id}")
         return deleted_count
     except Exception as e:
         logger.error(f"Error clearing user cache: {str(e)}")
         return 0
 
-def clear_issue_cache(issue_id: int):
+async def clear_issue_cache(issue_id: int):
     """Clear all cache entries for a specific issue"""
     try:
-        pattern = f"*issue:{issue_id}*"
-        deleted_count = cache_delete_pattern(pattern)
+        deleted_count = await cache_delete_tag(generate_issue_cache_tag(issue_id))
         logger.info(f"Cleared {deleted_count} cache entries for issue {issue_id}")
         return deleted_count
     except Exception as e:
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import case, delete, func, literal, select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal, RESOLVED_STATUSES, Issue, CustomerStats
+from app.core.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+# MySQL has no materialized views, so the 30-day per-customer aggregates are
+# kept in customer_stats_30d and rebuilt periodically in the background.
+# Status changes refresh the affected customer's row in the same transaction.
+CUSTOMER_STATS_WINDOW_DAYS = 30
+CUSTOMER_STATS_REFRESH_INTERVAL = 300  # seconds
+
+# Customer rows written per transaction by the full rebuild
+CUSTOMER_STATS_UPSERT_BATCH = 1000
+
+# Every worker runs the loop; the first to take this lock in an interval
+# does the rebuild, and the lock simply expires for the next one
+CUSTOMER_STATS_REFRESH_LOCK = "lock:customer_stats_refresh"
+
+_refresh_task: Optional[asyncio.Task] = None
+
+def _customer_aggregates(refreshed_at: datetime):
+    """Select the 30-day issue aggregates per customer, stamped with refreshed_at"""
+    resolved_states = Issue.status.in_(RESOLVED_STATUSES)
+    return (
+        select(
+            Issue.customer_id,
+            func.count().label("total_issues"),
+            func.count(case((resolved_states, 1))).label("resolved_issues"),
+            func.count(case((Issue.severity == "HIGH", 1))).label("critical_issues"),
+            func.avg(case((resolved_states, Issue.resolution_time))).label("avg_resolution_time"),
+            literal(refreshed_at, CustomerStats.refreshed_at.type).label("refreshed_at")
+        )
+        .where(Issue.created_at >= refreshed_at - timedelta(days=CUSTOMER_STATS_WINDOW_DAYS))
+        .group_by(Issue.customer_id)
+    )
+
+async def _upsert_customer_stats(db: AsyncSession, rows: List[Dict[str, Any]]):
+    """Write aggregate rows into customer_stats_30d, replacing existing ones"""
+    upsert = insert(CustomerStats).values(rows)
+    upsert = upsert.on_duplicate_key_update(
+        total_issues=upsert.inserted.total_issues,
+        resolved_issues=upsert.inserted.resolved_issues,
+        critical_issues=upsert.inserted.critical_issues,
+        avg_resolution_time=upsert.inserted.avg_resolution_time,
+        refreshed_at=upsert.inserted.refreshed_at
+    )
+    await db.execute(upsert)
+
+def _refresh_time() -> datetime:
+    """Current UTC time for refreshed_at"""
+    # Whole seconds, as stored by the DATETIME column; a fractional value
+    # would compare newer than the rows just written and delete them
+    return datetime.utcnow().replace(microsecond=0)
+
+async def refresh_customer_stats(db: AsyncSession, customer_id: int):
+    """
+    Recompute one customer's 30-day issue aggregates into customer_stats_30d.
+    
+    Runs in the caller's transaction; the caller commits. The aggregate is a
+    plain consistent read rather than INSERT ... SELECT, which would take
+    shared locks on every issue it reads and deadlock concurrent status
+    changes on other issues of the same customer.
+    
+    Args:
+        db: Database session
+        customer_id: Customer whose row is refreshed
+    """
+    refreshed_at = _refresh_time()
+    result = await db.execute(_customer_aggregates(refreshed_at).where(Issue.customer_id == customer_id))
+    rows = [dict(row) for row in result.mappings()]
+    if rows:
+        await _upsert_customer_stats(db, rows)
+    else:
+        # All of the customer's issues left the window
+        await db.execute(delete(CustomerStats).where(CustomerStats.customer_id == customer_id))
+
+async def rebuild_customer_stats():
+    """
+    Recompute every customer's 30-day issue aggregates into customer_stats_30d.
+    
+    The aggregates come from one non-locking read and are written back in
+    batches of CUSTOMER_STATS_UPSERT_BATCH, each in its own short
+    transaction, so the rebuild never holds locks that status updates wait on
+    for long.
+    """
+    refreshed_at = _refresh_time()
+    async with SessionLocal() as db:
+        result = await db.execute(_customer_aggregates(refreshed_at))
+        rows = [dict(row) for row in result.mappings()]
+        await db.commit()
+        
+        for start in range(0, len(rows), CUSTOMER_STATS_UPSERT_BATCH):
+            await _upsert_customer_stats(db, rows[start:start + CUSTOMER_STATS_UPSERT_BATCH])
+            await db.commit()
+        
+        # Customers whose issues all left the window were not rewritten above
+        await db.execute(delete(CustomerStats).where(CustomerStats.refreshed_at < refreshed_at))
+        await db.commit()
+
+async def refresh_customer_stats_loop():
+    """Rebuild customer_stats_30d every CUSTOMER_STATS_REFRESH_INTERVAL seconds"""
+    while True:
+        try:
+            acquired = await redis_client.set(
+                CUSTOMER_STATS_REFRESH_LOCK, "1", nx=True, ex=CUSTOMER_STATS_REFRESH_INTERVAL
+            )
+            if acquired:
+                await rebuild_customer_stats()
+        except Exception as e:
+            logger.error(f"Error refreshing customer stats: {str(e)}")
+        await asyncio.sleep(CUSTOMER_STATS_REFRESH_INTERVAL)
+
+def start_customer_stats_refresher():
+    """Start the background customer stats refresh"""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(refresh_customer_stats_loop())
+
+async def stop_customer_stats_refresher():
+    """Stop the background customer stats refresh"""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
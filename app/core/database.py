@@ -1,54 +1,66 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Enum, ForeignKey, DECIMAL, Boolean
+from sqlalchemy import Column, Computed, Integer, String, Text, DateTime, Enum, ForeignKey, DECIMAL, Boolean, Index, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import relationship, joinedload, selectinload
+import asyncio
 import logging
-from datetime import datetime
-from typing import Generator
-import redis
-import pymysql
+from typing import AsyncGenerator
+import redis.asyncio as aioredis
 
-from app.core.config import settings, get_database_url, get_redis_url
+from app.core.config import settings, get_database_url
+from app.core.cache import redis_client
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Database engine configuration
-engine = create_engine(
+engine = create_async_engine(
     get_database_url(),
-    poolclass=QueuePool,
-    pool_size=20,
-    max_overflow=30,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=True,
+    # No pre-ping round trip on checkout: connections are recycled before the
+    # server's wait_timeout (pinned below) can close them. A connection that
+    # still drops is reported as a disconnect and the pool is invalidated.
+    pool_pre_ping=False,
+    # Server-side timestamp defaults use NOW(); pin sessions to UTC so they
+    # match the datetime.utcnow() values the services compare against
+    connect_args={
+        "init_command": f"SET time_zone = '+00:00', wait_timeout = {settings.DB_SESSION_WAIT_TIMEOUT}"
+    },
     echo=settings.DEBUG
 )
 
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
 
-# Redis connection
-redis_client = redis.from_url(get_redis_url(), decode_responses=True)
-
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Database dependency for FastAPI.
     Provides a database session and ensures proper cleanup.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception as e:
-        logger.error(f"Database session error: {str(e)}")
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    async with SessionLocal() as db:
+        try:
+            yield db
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                logger.warning(f"Stale database connection discarded: {str(e)}")
+            else:
+                logger.error(f"Database session error: {str(e)}")
+            await db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Database session error: {str(e)}")
+            await db.rollback()
+            raise
 
-def get_redis() -> redis.Redis:
+def get_redis() -> aioredis.Redis:
     """
     Redis connection dependency.
     """
@@ -64,17 +76,22 @@ class Customer(Base):
     name = Column(String(255), nullable=False)
     company = Column(String(255))
     vip_status = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     total_issues = Column(Integer, default=0)
     avg_resolution_time = Column(DECIMAL(10, 2))  # in hours
 
+# Statuses of finished issues, shared by queries and status transitions;
+# open issues are filtered on the stored Issue.is_open column instead
+RESOLVED_STATUSES = ("RESOLVED", "CLOSED")
+
 class Issue(Base):
     """Issue model for storing support issues"""
     __tablename__ = "issues"
     
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
+    # Indexed by the (customer_id, created_at) composite below
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=False)
     category = Column(String(100))
@@ -82,11 +99,28 @@ class Issue(Base):
     status = Column(Enum("OPEN", "IN_PROGRESS", "RESOLVED", "CLOSED", name="status_enum"), default="OPEN")
     priority = Column(String(50))
     assigned_to = Column(String(255))
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     resolved_at = Column(DateTime)
     resolution_time = Column(DECIMAL(10, 2))  # in hours
     ai_confidence_score = Column(DECIMAL(3, 2))  # 0.00 to 1.00
+    # Stored generated flag; MySQL has no partial indexes, so open-issue
+    # queries filter on this column to stay off the closed history
+    is_open = Column(Boolean, Computed("status IN ('OPEN', 'IN_PROGRESS')", persisted=True))
+    
+    # Related rows must be loaded explicitly (joinedload/selectinload) so
+    # accidental lazy loads fail loudly instead of issuing N+1 queries
+    customer = relationship("Customer", lazy="raise")
+    conversations = relationship("Conversation", lazy="raise", order_by="Conversation.created_at")
+    recommendations = relationship("Recommendation", lazy="raise")
+    
+    __table_args__ = (
+        Index("ix_issue_status_sev_created", "status", "severity", "created_at"),
+        Index("ix_open_critical", "is_open", "severity", "created_at"),
+        # Per-customer history windows and status + recency scans
+        Index("idx_customer_created", "customer_id", "created_at"),
+        Index("idx_issues_status_created", "status", "created_at"),
+    )
 
 class Conversation(Base):
     """Conversation model for storing issue conversations"""
@@ -97,8 +131,12 @@ class Conversation(Base):
     message = Column(Text, nullable=False)
     sender_type = Column(Enum("CUSTOMER", "SUPPORT", name="sender_enum"), nullable=False)
     sender_id = Column(String(255))
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
     sentiment_score = Column(DECIMAL(3, 2))  # -1.0 to 1.0
+    
+    __table_args__ = (
+        Index("ix_conv_issue_created", "issue_id", "created_at"),
+    )
 
 class Recommendation(Base):
     """Recommendation model for storing AI-generated recommendations"""
@@ -109,10 +147,18 @@ class Recommendation(Base):
     template_text = Column(Text, nullable=False)
     message_type = Column(String(50))  # greeting, solution, follow-up
     tone = Column(String(50))  # professional, friendly, urgent
-    confidence_score = Column(DECIMAL(3, 2), nullable=False)
+    # Read back as Python floats; the column keeps its exact DECIMAL storage
+    confidence_score = Column(DECIMAL(3, 2, asdecimal=False), nullable=False)
     reasoning = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
     used_count = Column(Integer, default=0)
+    
+    __table_args__ = (
+        Index("ix_rec_issue_conf", "issue_id", confidence_score.desc()),
+        # Per-issue history newest first, and the popular list by usage
+        Index("ix_rec_issue_created", "issue_id", created_at.desc()),
+        Index("ix_rec_used", used_count.desc()),
+    )
 
 class ConversationSummary(Base):
     """Conversation summary model for storing AI-generated summaries"""
@@ -125,7 +171,7 @@ class ConversationSummary(Base):
     action_items = Column(Text)  # JSON array of action items
     sentiment = Column(String(50))
     processing_status = Column(String(50), default="pending")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
 
 class SimilarIssue(Base):
     """Similar issue model for storing issue similarity relationships"""
@@ -136,7 +182,21 @@ class SimilarIssue(Base):
     similar_issue_id = Column(Integer, ForeignKey("issues.id"), nullable=False, index=True)
     similarity_score = Column(DECIMAL(3, 2), nullable=False)
     similarity_reason = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    
+    source = relationship("Issue", foreign_keys=[source_issue_id], lazy="raise")
+    target = relationship("Issue", foreign_keys=[similar_issue_id], lazy="raise")
+
+class CustomerStats(Base):
+    """Rolling 30-day issue aggregates per customer, refreshed in the background"""
+    __tablename__ = "customer_stats_30d"
+    
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    total_issues = Column(Integer, nullable=False, default=0)
+    resolved_issues = Column(Integer, nullable=False, default=0)
+    critical_issues = Column(Integer, nullable=False, default=0)
+    avg_resolution_time = Column(DECIMAL(10, 2))  # in hours
+    refreshed_at = Column(DateTime, nullable=False, index=True)
 
 class User(Base):
     """User model for support executives"""
@@ -144,11 +204,11 @@ class User(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(255), unique=True, nullable=False, index=True)
-    email = Column(String(255), unique=True, nullable=False)
+    email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(50), default="support_executive")
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
     last_login = Column(DateTime)
 
 class AuditLog(Base):
@@ -162,75 +222,98 @@ class AuditLog(Base):
     resource_id = Column(Integer)
     details = Column(Text)  # JSON object with action details
     ip_address = Column(String(45))
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+
+# Seconds a connectivity probe may take before the dependency counts as down
+HEALTH_CHECK_TIMEOUT = 2
 
 # Database initialization
-def init_db():
+async def init_db():
     """Initialize database tables"""
     try:
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {str(e)}")
         raise
 
-def check_db_connection():
-    """Check database connectivity"""
+async def check_db_connection():
+    """Check database connectivity by running a probe on a pooled connection"""
     try:
-        with engine.connect() as connection:
-            connection.execute("SELECT 1")
-        logger.info("Database connection successful")
+        async with engine.connect() as connection:
+            await asyncio.wait_for(connection.execute(text("SELECT 1")), timeout=HEALTH_CHECK_TIMEOUT)
+        logger.debug("Database connection successful")
         return True
     except Exception as e:
         logger.error(f"Database connection failed: {str(e)}")
         return False
 
-def check_redis_connection():
+async def check_redis_connection():
     """Check Redis connectivity"""
     try:
-        redis_client.ping()
-        logger.info("Redis connection successful")
+        await asyncio.wait_for(redis_client.ping(), timeout=HEALTH_CHECK_TIMEOUT)
+        logger.debug("Redis connection successful")
         return True
     except Exception as e:
         logger.error(f"Redis connection failed: {str(e)}")
         return False
 
 # Database utilities
-def get_issue_by_id(db: Session, issue_id: int):
+async def get_issue_by_id(db: AsyncSession, issue_id: int):
     """Get issue by ID with customer information"""
-    return db.query(Issue).filter(Issue.id == issue_id).first()
+    result = await db.execute(
+        select(Issue).options(joinedload(Issue.customer)).where(Issue.id == issue_id)
+    )
+    return result.scalars().first()
 
-def get_customer_by_id(db: Session, customer_id: int):
+async def get_customer_by_id(db: AsyncSession, customer_id: int):
     """Get customer by ID with issue count"""
-    return db.query(Customer).filter(Customer.id == customer_id).first()
+    return await db.get(Customer, customer_id)
 
-def get_conversations_by_issue_id(db: Session, issue_id: int):
+async def get_conversations_by_issue_id(db: AsyncSession, issue_id: int):
     """Get all conversations for an issue"""
-    return db.query(Conversation).filter(Conversation.issue_id == issue_id).order_by(Conversation.created_at).all()
+    result = await db.execute(
+        select(Conversation).where(Conversation.issue_id == issue_id).order_by(Conversation.created_at)
+    )
+    return result.scalars().all()
 
-def get_recommendations_by_issue_id(db: Session, issue_id: int):
+async def get_recommendations_by_issue_id(db: AsyncSession, issue_id: int):
     """Get all recommendations for an issue"""
-    return db.query(Recommendation).filter(Recommendation.issue_id == issue_id).order_by(Recommendation.confidence_score.desc()).all()
+    result = await db.execute(
+        select(Recommendation).where(Recommendation.issue_id == issue_id).order_by(Recommendation.confidence_score.desc())
+    )
+    return result.scalars().all()
+
+async def get_similar_issues_by_issue_id(db: AsyncSession, issue_id: int):
+    """Get stored similar issues for an issue, loading all targets in one IN query"""
+    result = await db.execute(
+        select(SimilarIssue)
+        .where(SimilarIssue.source_issue_id == issue_id)
+        .options(selectinload(SimilarIssue.target).joinedload(Issue.customer))
+        .order_by(SimilarIssue.similarity_score.desc())
+    )
+    return result.scalars().all()
 
 # Cache utilities
-def cache_set(key: str, value: str, ttl: int = 300):
+async def cache_set(key: str, value: str, ttl: int = 300):
     """Set cache value with TTL"""
     try:
-        redis_client.setex(key, ttl, value)
+        await redis_client.setex(key, ttl, value)
     except Exception as e:
         logger.error(f"Cache set error: {str(e)}")
 
-def cache_get(key: str) -> str:
+async def cache_get(key: str) -> str:
     """Get cache value"""
     try:
-        return redis_client.get(key)
+        return await redis_client.get(key)
     except Exception as e:
         logger.error(f"Cache get error: {str(e)}")
         return None
 
-def cache_delete(key: str):
+async def cache_delete(key: str):
     """Delete cache value"""
     try:
-        redis_client.delete(key)
+        await redis_client.delete(key)
     except Exception as e:
         logger.error(f"Cache delete error: {str(e)}") 
\ No newline at end of file
@@ -1,38 +1,69 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.security import HTTPBearer
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import uvicorn
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+import hashlib
+import inspect
 import logging
+import os
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Type
 import json
+import msgspec
+import orjson
+from pydantic import BaseModel
 
 from app.core.config import settings
-from app.core.database import get_db
-from app.core.auth import get_current_user, authenticate_user, create_access_token
+from app.core.database import get_db, check_db_connection, check_redis_connection
+from app.core.auth import CurrentUser, get_current_user, authenticate_user, create_access_token, revoke_token
+from app.core.cache import cached_response
+from app.core.audit import record_audit_event, start_audit_flusher, stop_audit_flusher
+from app.core.customer_stats import start_customer_stats_refresher, stop_customer_stats_refresher
 from app.models.schemas import (
-    IssueCreate, IssueResponse, IssueAnalysis, 
+    IssueCreate, IssueResponse, IssueAnalysis, IssueStatusBatch,
     RecommendationRequest, RecommendationResponse,
-    ConversationSummary, CustomerHistory, UserLogin, Token
+    ConversationSummary, CustomerHistory, UserLogin, Token,
+    IssueCreateMsg, RecommendationRequestMsg, UserLoginMsg
 )
 from app.services.issue_service import IssueService
-from app.services.ai_service import AIService
+from app.services.ai_service import AIService, get_ai_service, init_ai_service
 from app.services.recommendation_service import RecommendationService
-from sqlalchemy.orm import Session
-from fastapi import Body
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the shared AI models before serving so the first request is warm,
+    start the background writers, and write out queued audit events before
+    the worker exits.
+    """
+    await init_ai_service()
+    start_audit_flusher()
+    start_customer_stats_refresher()
+    yield
+    await stop_customer_stats_refresher()
+    await stop_audit_flusher()
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="Support Copilot API",
     description="AI-powered support issue lifecycle management system",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Security
@@ -52,23 +83,105 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+# Service dependencies
+def get_issue_service(
+    db: AsyncSession = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service)
+) -> IssueService:
+    """Issue service bound to the request's database session"""
+    return IssueService(db, ai_service)
+
+def get_recommendation_service(
+    db: AsyncSession = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service)
+) -> RecommendationService:
+    """Recommendation service bound to the request's database session"""
+    return RecommendationService(db, ai_service)
+
+# Request body decoding
+def msgspec_body(struct_type: Type[msgspec.Struct]):
+    """
+    Build a dependency that decodes the JSON body with msgspec.
+    
+    Args:
+        struct_type: msgspec Struct describing the body; must define to_model()
+        
+    Returns:
+        Dependency returning the equivalent pydantic model
+    """
+    decoder = msgspec.json.Decoder(struct_type)
+    
+    async def dependency(request: Request):
+        try:
+            return decoder.decode(await request.body()).to_model()
+        except (msgspec.DecodeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    
+    return dependency
+
+def body_schema(model) -> Dict[str, Any]:
+    """OpenAPI request body for a route whose body is decoded by msgspec_body"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
+
+# Conditional GET
+def etag_response(func):
+    """
+    Serve a GET endpoint's JSON with an ETag and answer matching
+    If-None-Match requests with 304 Not Modified.
+    
+    Args:
+        func: Async endpoint returning a dict or pydantic model
+        
+    Returns:
+        Wrapped endpoint that also receives the request
+    """
+    signature = inspect.signature(func)
+    
+    @functools.wraps(func)
+    async def wrapper(*args, etag_request: Request, **kwargs):
+        response = await func(*args, **kwargs)
+        payload = response.model_dump(mode="json") if isinstance(response, BaseModel) else response
+        body = orjson.dumps(payload, default=jsonable_encoder)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        
+        if_none_match = etag_request.headers.get("if-none-match")
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+    
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter("etag_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+    ])
+    return wrapper
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for load balancer"""
+    """Health check endpoint for load balancer, probing the DB pool and Redis"""
+    db_ok, redis_ok = await asyncio.gather(check_db_connection(), check_redis_connection())
     return {
-        "status": "healthy",
+        "status": "healthy" if db_ok and redis_ok else "degraded",
+        "database": "ok" if db_ok else "unavailable",
+        "cache": "ok" if redis_ok else "unavailable",
         "timestamp": datetime.utcnow().isoformat(),
         "version": "1.0.0"
     }
 
 # Issue Analysis Endpoint
-@app.post("/api/v1/issues/analyze", response_model=IssueAnalysis)
+@app.post("/api/v1/issues/analyze", response_model=IssueAnalysis, openapi_extra=body_schema(IssueCreate))
 async def analyze_issue(
-    issue: IssueCreate,
     background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    issue: IssueCreate = Depends(msgspec_body(IssueCreateMsg)),
+    current_user: CurrentUser = Depends(get_current_user),
+    issue_service: IssueService = Depends(get_issue_service)
 ):
     """
     Analyze a new support issue and provide insights.
@@ -81,14 +194,16 @@ async def analyze_issue(
     5. Returns analysis within 15 seconds
     """
     try:
-        issue_service = IssueService(db)
-        ai_service = AIService()
-        
         # Start timing for performance monitoring
         start_time = datetime.utcnow()
         
         # Core analysis (synchronous for <15s response)
-        analysis = await issue_service.analyze_new_issue(issue, ai_service)
+        analysis = await issue_service.analyze_new_issue(issue)
+        record_audit_event(
+            "issue_analyzed", user_id=current_user.id,
+            resource_type="customer", resource_id=issue.customer_id,
+            details={"severity": analysis.severity_assessment, "confidence": analysis.confidence_score}
+        )
         
         # Background tasks for heavy processing
         background_tasks.add_task(
@@ -108,12 +223,13 @@ async def analyze_issue(
         raise HTTPException(status_code=500, detail="Issue analysis failed")
 
 # Recommendation Generation Endpoint
-@app.post("/api/v1/issues/{issue_id}/recommend", response_model=RecommendationResponse)
+@app.post("/api/v1/issues/{issue_id}/recommend", response_model=RecommendationResponse,
+          openapi_extra=body_schema(RecommendationRequest))
 async def get_recommendations(
     issue_id: int,
-    request: RecommendationRequest,
-    current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    request: RecommendationRequest = Depends(msgspec_body(RecommendationRequestMsg)),
+    current_user: CurrentUser = Depends(get_current_user),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """
     Generate recommended message templates for support executives.
@@ -125,13 +241,14 @@ async def get_recommendations(
     - Severity and criticality tags
     """
     try:
-        recommendation_service = RecommendationService(db)
-        ai_service = AIService()
-        
         recommendations = await recommendation_service.generate_recommendations(
             issue_id, 
-            request.context, 
-            ai_service
+            request.context
+        )
+        record_audit_event(
+            "recommendation_generated", user_id=current_user.id,
+            resource_type="issue", resource_id=issue_id,
+            details={"recommendations_count": len(recommendations.recommendations)}
         )
         
         return recommendations
@@ -145,8 +262,9 @@ async def get_recommendations(
 async def summarize_conversation(
     conversation_id: int,
     background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Generate a concise summary of the entire conversation.
@@ -157,8 +275,6 @@ async def summarize_conversation(
     - Training data for ML models
     """
     try:
-        ai_service = AIService()
-        
         # Process summarization in background
         background_tasks.add_task(
             ai_service.summarize_conversation_async,
@@ -174,10 +290,17 @@ async def summarize_conversation(
 
 # Customer History Endpoint
 @app.get("/api/v1/customers/{customer_id}/history", response_model=CustomerHistory)
+@etag_response
+@cached_response(
+    "customer_history",
+    ttl=60,
+    key_builder=lambda customer_id, current_user, **_: f"{customer_id}:{current_user.role}",
+    tag_builder=lambda customer_id, **_: f"customer_history:{customer_id}"
+)
 async def get_customer_history(
     customer_id: int,
-    current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    issue_service: IssueService = Depends(get_issue_service)
 ):
     """
     Retrieve comprehensive customer history including:
@@ -187,7 +310,6 @@ async def get_customer_history(
     - Critical issues
     """
     try:
-        issue_service = IssueService(db)
         history = await issue_service.get_customer_history(customer_id)
         return history
         
@@ -200,24 +322,77 @@ async def get_customer_history(
 async def update_issue_status(
     issue_id: int,
     status: str,
-    current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
+    issue_service: IssueService = Depends(get_issue_service),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """Update issue status and trigger relevant notifications"""
     try:
-        issue_service = IssueService(db)
-        await issue_service.update_issue_status(issue_id, status)
+        updated = await issue_service.update_issue_status(issue_id, status)
+        if not updated:
+            if not await issue_service.issue_exists(issue_id):
+                raise HTTPException(status_code=404, detail="Issue not found")
+            raise HTTPException(status_code=409, detail="Status update could not be applied")
+        record_audit_event(
+            "issue_status_updated", user_id=current_user.id,
+            resource_type="issue", resource_id=issue_id,
+            details={"new_status": status}
+        )
+        
+        # An agent picking up the issue asks for recommendations next
+        if status == "IN_PROGRESS":
+            background_tasks.add_task(recommendation_service.prefetch_recommendations, issue_id)
         return {"message": "Status updated successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating issue status: {str(e)}")
         raise HTTPException(status_code=500, detail="Status update failed")
 
+# Batch Issue Status Update Endpoint
+@app.put("/api/v1/issues/status/batch")
+async def update_issue_statuses(
+    batch: IssueStatusBatch,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
+    issue_service: IssueService = Depends(get_issue_service),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
+):
+    """Update the status of several issues in one request, reporting each outcome"""
+    try:
+        updates = [(item.issue_id, item.status.value) for item in batch.updates]
+        outcomes = await issue_service.update_issue_statuses(updates)
+        results = []
+        for (issue_id, status), updated in zip(updates, outcomes):
+            if updated:
+                record_audit_event(
+                    "issue_status_updated", user_id=current_user.id,
+                    resource_type="issue", resource_id=issue_id,
+                    details={"new_status": status}
+                )
+                if status == "IN_PROGRESS":
+                    background_tasks.add_task(recommendation_service.prefetch_recommendations, issue_id)
+            results.append({"issue_id": issue_id, "ok": updated})
+        
+        return {"results": results}
+        
+    except Exception as e:
+        logger.error(f"Error updating issue statuses: {str(e)}")
+        raise HTTPException(status_code=500, detail="Status update failed")
+
 # Critical Issues Alert Endpoint
 @app.get("/api/v1/issues/critical")
+@etag_response
+@cached_response(
+    "critical_issues",
+    ttl=30,
+    key_builder=lambda current_user, **_: current_user.role
+)
 async def get_critical_issues(
-    current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    issue_service: IssueService = Depends(get_issue_service)
 ):
     """
     Get all critical issues that require immediate attention.
@@ -228,7 +403,6 @@ async def get_critical_issues(
     - Issues from VIP customers
     """
     try:
-        issue_service = IssueService(db)
         critical_issues = await issue_service.get_critical_issues()
         return {"critical_issues": critical_issues}
         
@@ -237,30 +411,64 @@ async def get_critical_issues(
         raise HTTPException(status_code=500, detail="Failed to retrieve critical issues")
 
 # Performance Metrics Endpoint
+def current_performance_metrics() -> Dict[str, Any]:
+    """Current system performance metrics"""
+    return {
+        "api_response_time_avg": 0.8,
+        "active_issues": 150,
+        "resolved_today": 45,
+        "critical_issues": 3,
+        "system_health": "healthy"
+    }
+
 @app.get("/api/v1/metrics")
+@cached_response(
+    "metrics",
+    ttl=60,
+    key_builder=lambda current_user, **_: current_user.role
+)
 async def get_performance_metrics(
-    current_user: dict = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db = Depends(get_db)
 ):
     try:
-        metrics = {
-            "api_response_time_avg": 0.8,
-            "active_issues": 150,
-            "resolved_today": 45,
-            "critical_issues": 3,
-            "system_health": "healthy"
-        }
+        metrics = current_performance_metrics()
         return metrics
     except Exception as e:
         logger.error(f"Error retrieving metrics: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve metrics")
 
-@app.post("/api/v1/auth/login", response_model=Token)
+# Dashboard Endpoint
+@app.get("/api/v1/dashboard")
+@etag_response
+async def get_dashboard(
+    customer_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    issue_service: IssueService = Depends(get_issue_service)
+):
+    """
+    Critical issues, performance metrics and one customer's history in a
+    single response, for dashboards that always load them together.
+    """
+    try:
+        history = await issue_service.get_customer_history(customer_id)
+        critical_issues = await issue_service.get_critical_issues()
+        return {
+            "critical_issues": critical_issues,
+            "metrics": current_performance_metrics(),
+            "customer_history": history.model_dump(mode="json")
+        }
+        
+    except Exception as e:
+        logger.error(f"Error retrieving dashboard: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve dashboard")
+
+@app.post("/api/v1/auth/login", response_model=Token, openapi_extra=body_schema(UserLogin))
 async def login(
-    payload: UserLogin = Body(...),
-    db: Session = Depends(get_db)
+    payload: UserLogin = Depends(msgspec_body(UserLoginMsg)),
+    db: AsyncSession = Depends(get_db)
 ):
-    user = authenticate_user(db, payload.username, payload.password)
+    user = await authenticate_user(db, payload.username, payload.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
     access_token = create_access_token({"sub": user.id})
@@ -270,11 +478,27 @@ async def login(
         "expires_in": 60 * 30  # 30 minutes
     }
 
+@app.post("/api/v1/auth/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Revoke the caller's bearer token"""
+    if not await revoke_token(credentials.credentials):
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return {"message": "Logged out successfully"}
+
 if __name__ == "__main__":
+    # uvloop and httptools in production; the reloader only supports a
+    # single process, so DEBUG runs one worker
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+        loop="uvloop",
+        http="httptools",
+        workers=1 if settings.DEBUG else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        reload=settings.DEBUG,
+        log_level="info",
+        access_log=settings.DEBUG,
+        # Outlive the load balancer's idle timeout so it, not uvicorn,
+        # closes idle keep-alive connections
+        timeout_keep_alive=65
+    )
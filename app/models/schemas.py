@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
+import msgspec
 
 # Enums
 class SeverityLevel(str, Enum):
@@ -19,6 +20,89 @@ class SenderType(str, Enum):
     CUSTOMER = "CUSTOMER"
     SUPPORT = "SUPPORT"
 
+# OpenAPI examples, built once and shared by reference with the models below
+ISSUE_ANALYSIS_EXAMPLE = {
+    "issue_id": 12345,
+    "severity_assessment": "HIGH",
+    "confidence_score": 0.85,
+    "customer_history": {
+        "total_issues": 15,
+        "avg_resolution_time": "2.5 hours",
+        "critical_issues": 2
+    },
+    "similar_issues": [
+        {
+            "issue_id": 12340,
+            "similarity_score": 0.92,
+            "resolution": "Updated firewall settings"
+        }
+    ],
+    "critical_flags": [
+        "VIP customer",
+        "Similar issue unresolved for 48h"
+    ],
+    "recommended_actions": [
+        "Assign to senior support engineer",
+        "Escalate to technical team"
+    ],
+    "processing_time": 0.8
+}
+
+RECOMMENDATION_RESPONSE_EXAMPLE = {
+    "issue_id": 12345,
+    "recommendations": [
+        {
+            "template": "Thank you for reaching out. I understand you're experiencing [issue]. Let me help you resolve this quickly.",
+            "type": "greeting",
+            "tone": "professional"
+        },
+        {
+            "template": "Based on similar cases, this issue can be resolved by [solution]. Would you like me to guide you through the steps?",
+            "type": "solution",
+            "tone": "helpful"
+        }
+    ],
+    "confidence_scores": [0.92, 0.88],
+    "reasoning": "High confidence due to similar resolved issues in database"
+}
+
+CONVERSATION_SUMMARY_EXAMPLE = {
+    "conversation_id": 12345,
+    "summary": "Customer reported login issues. Support provided step-by-step troubleshooting. Issue resolved by clearing browser cache.",
+    "key_points": [
+        "Login authentication problem",
+        "Browser cache clearing required",
+        "Issue resolved successfully"
+    ],
+    "action_items": [
+        "Document solution for knowledge base",
+        "Follow up with customer in 24h"
+    ],
+    "sentiment": "positive",
+    "processing_status": "completed"
+}
+
+CUSTOMER_HISTORY_EXAMPLE = {
+    "customer_id": 1001,
+    "total_issues": 15,
+    "resolved_issues": 14,
+    "avg_resolution_time": "2.5 hours",
+    "critical_issues": 2,
+    "recent_issues": [
+        {
+            "issue_id": 12345,
+            "title": "Login authentication failed",
+            "status": "RESOLVED",
+            "resolution_time": "1.5 hours"
+        }
+    ],
+    "issue_patterns": [
+        "Authentication issues",
+        "Browser compatibility"
+    ],
+    "customer_satisfaction": 4.2
+}
+
 # Base Models
 class BaseResponse(BaseModel):
     success: bool = True
@@ -27,23 +111,14 @@ class BaseResponse(BaseModel):
 
 # Issue Models
 class IssueCreate(BaseModel):
+    # Whitespace is stripped before the length constraints are checked
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
     customer_id: int = Field(..., description="Customer ID")
     title: str = Field(..., min_length=1, max_length=500, description="Issue title")
     description: str = Field(..., min_length=10, description="Issue description")
     category: Optional[str] = Field(None, description="Issue category")
     priority: Optional[str] = Field(None, description="Customer priority level")
-    
-    @validator('title')
-    def validate_title(cls, v):
-        if not v.strip():
-            raise ValueError('Title cannot be empty')
-        return v.strip()
-    
-    @validator('description')
-    def validate_description(cls, v):
-        if len(v.strip()) < 10:
-            raise ValueError('Description must be at least 10 characters')
-        return v.strip()
 
 class IssueResponse(BaseModel):
     id: int
@@ -57,8 +132,7 @@ class IssueResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class IssueAnalysis(BaseModel):
     issue_id: int
@@ -70,47 +144,25 @@ class IssueAnalysis(BaseModel):
     recommended_actions: List[str]
     processing_time: float
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "issue_id": 12345,
-                "severity_assessment": "HIGH",
-                "confidence_score": 0.85,
-                "customer_history": {
-                    "total_issues": 15,
-                    "avg_resolution_time": "2.5 hours",
-                    "critical_issues": 2
-                },
-                "similar_issues": [
-                    {
-                        "issue_id": 12340,
-                        "similarity_score": 0.92,
-                        "resolution": "Updated firewall settings"
-                    }
-                ],
-                "critical_flags": [
-                    "VIP customer",
-                    "Similar issue unresolved for 48h"
-                ],
-                "recommended_actions": [
-                    "Assign to senior support engineer",
-                    "Escalate to technical team"
-                ],
-                "processing_time": 0.8
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": ISSUE_ANALYSIS_EXAMPLE})
+
+# Most status changes accepted in one batch request
+STATUS_BATCH_MAX_UPDATES = 100
+
+class IssueStatusUpdate(BaseModel):
+    issue_id: int
+    status: IssueStatus
+
+class IssueStatusBatch(BaseModel):
+    updates: List[IssueStatusUpdate] = Field(..., min_length=1, max_length=STATUS_BATCH_MAX_UPDATES)
 
 # Recommendation Models
 class RecommendationRequest(BaseModel):
-    context: str = Field(..., description="Current conversation context")
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
+    context: str = Field(..., min_length=1, description="Current conversation context")
     message_type: str = Field(..., description="Type of message (greeting, solution, follow-up)")
     tone: Optional[str] = Field("professional", description="Desired tone of message")
-    
-    @validator('context')
-    def validate_context(cls, v):
-        if not v.strip():
-            raise ValueError('Context cannot be empty')
-        return v.strip()
 
 class RecommendationResponse(BaseModel):
     issue_id: int
@@ -118,26 +170,7 @@ class RecommendationResponse(BaseModel):
     confidence_scores: List[float]
     reasoning: str
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "issue_id": 12345,
-                "recommendations": [
-                    {
-                        "template": "Thank you for reaching out. I understand you're experiencing [issue]. Let me help you resolve this quickly.",
-                        "type": "greeting",
-                        "tone": "professional"
-                    },
-                    {
-                        "template": "Based on similar cases, this issue can be resolved by [solution]. Would you like me to guide you through the steps?",
-                        "type": "solution",
-                        "tone": "helpful"
-                    }
-                ],
-                "confidence_scores": [0.92, 0.88],
-                "reasoning": "High confidence due to similar resolved issues in database"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": RECOMMENDATION_RESPONSE_EXAMPLE})
 
 # Conversation Models
 class ConversationMessage(BaseModel):
@@ -147,8 +180,7 @@ class ConversationMessage(BaseModel):
     sender_type: SenderType
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ConversationSummary(BaseModel):
     conversation_id: int
@@ -158,24 +190,7 @@ class ConversationSummary(BaseModel):
     sentiment: str
     processing_status: str = "completed"
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "conversation_id": 12345,
-                "summary": "Customer reported login issues. Support provided step-by-step troubleshooting. Issue resolved by clearing browser cache.",
-                "key_points": [
-                    "Login authentication problem",
-                    "Browser cache clearing required",
-                    "Issue resolved successfully"
-                ],
-                "action_items": [
-                    "Document solution for knowledge base",
-                    "Follow up with customer in 24h"
-                ],
-                "sentiment": "positive",
-                "processing_status": "completed"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": CONVERSATION_SUMMARY_EXAMPLE})
 
 # Customer Models
 class CustomerHistory(BaseModel):
@@ -188,29 +203,7 @@ class CustomerHistory(BaseModel):
     issue_patterns: List[str]
     customer_satisfaction: Optional[float]
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "customer_id": 1001,
-                "total_issues": 15,
-                "resolved_issues": 14,
-                "avg_resolution_time": "2.5 hours",
-                "critical_issues": 2,
-                "recent_issues": [
-                    {
-                        "issue_id": 12345,
-                        "title": "Login authentication failed",
-                        "status": "RESOLVED",
-                        "resolution_time": "1.5 hours"
-                    }
-                ],
-                "issue_patterns": [
-                    "Authentication issues",
-                    "Browser compatibility"
-                ],
-                "customer_satisfaction": 4.2
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": CUSTOMER_HISTORY_EXAMPLE})
 
 # Performance Models
 class PerformanceMetrics(BaseModel):
@@ -247,8 +240,7 @@ class UserResponse(BaseModel):
     role: str
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Webhook Models
 class WebhookPayload(BaseModel):
@@ -272,4 +264,59 @@ class SearchResponse(BaseModel):
     total_count: int
     page: int
     page_size: int
-    filters_applied: SearchFilters 
\ No newline at end of file
+    filters_applied: SearchFilters
+
+# Request body structs
+# POST bodies are decoded with msgspec and the same strip/length rules as the
+# pydantic models above are applied inline; the pydantic classes remain the
+# documented (OpenAPI) request schemas and the types the services receive.
+def _checked_str(value: Optional[str], field: str, min_length: int = 0,
+                 max_length: Optional[int] = None, strip: bool = True) -> Optional[str]:
+    """Optionally strip a string field and enforce its length bounds"""
+    if value is None:
+        return None
+    if strip:
+        value = value.strip()
+    if len(value) < min_length:
+        raise ValueError(f"{field} must be at least {min_length} characters")
+    if max_length is not None and len(value) > max_length:
+        raise ValueError(f"{field} must be at most {max_length} characters")
+    return value
+
+class IssueCreateMsg(msgspec.Struct, frozen=True):
+    customer_id: int
+    title: str
+    description: str
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    
+    def to_model(self) -> IssueCreate:
+        return IssueCreate.model_construct(
+            customer_id=self.customer_id,
+            title=_checked_str(self.title, "title", 1, 500),
+            description=_checked_str(self.description, "description", 10),
+            category=_checked_str(self.category, "category"),
+            priority=_checked_str(self.priority, "priority")
+        )
+
+class RecommendationRequestMsg(msgspec.Struct, frozen=True):
+    context: str
+    message_type: str
+    tone: Optional[str] = "professional"
+    
+    def to_model(self) -> RecommendationRequest:
+        return RecommendationRequest.model_construct(
+            context=_checked_str(self.context, "context", 1),
+            message_type=_checked_str(self.message_type, "message_type"),
+            tone=_checked_str(self.tone, "tone")
+        )
+
+class UserLoginMsg(msgspec.Struct, frozen=True):
+    username: str
+    password: str
+    
+    def to_model(self) -> UserLogin:
+        return UserLogin.model_construct(
+            username=_checked_str(self.username, "username", 1, strip=False),
+            password=_checked_str(self.password, "password", 1, strip=False)
+        )
@@ -1,48 +1,250 @@
+import asyncio
+import hashlib
 import logging
 import json
+import os
+import time
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import openai
+from sklearn.metrics.pairwise import linear_kernel
+from openai import AsyncOpenAI
 from transformers import pipeline, AutoTokenizer, AutoModel
 import torch
 from sentence_transformers import SentenceTransformer
 import re
+from collections import Counter, OrderedDict
+from itertools import islice
+from sqlalchemy import and_, case, select, func
+from sqlalchemy.orm import aliased, selectinload
 
 from app.core.config import settings
-from app.core.database import get_db, Issue, Customer, Conversation, Recommendation, ConversationSummary
+from app.core.database import get_db, RESOLVED_STATUSES, Issue, Customer, Conversation, Recommendation, ConversationSummary
 from app.models.schemas import SeverityLevel
+from app.core.cache import (
+    cache_get, cache_get_json, cache_set_json, cache_mget_json, cache_mset_json,
+    RESOLVED_INDEX_VERSION_KEY
+)
 
 logger = logging.getLogger(__name__)
 
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern":
+    """
+    Compile keywords into one case-insensitive alternation. The lookahead
+    reports a match at every position, so overlapping keywords are all
+    found, matching the substring checks this replaces.
+    """
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))", re.IGNORECASE)
+
+def _count_keywords(pattern: "re.Pattern", text: str) -> int:
+    """Count the distinct keywords of a pattern that occur in text"""
+    return len({match.lower() for match in pattern.findall(text)})
+
+SUMMARY_KEYWORDS_RE = _keyword_pattern(['issue', 'problem', 'resolved', 'fixed', 'error'])
+KEY_POINT_KEYWORDS_RE = _keyword_pattern(['issue', 'problem', 'error', 'resolved', 'fixed', 'solution', 'help'])
+ACTION_PHRASES_RE = _keyword_pattern([
+    'need to', 'should', 'must', 'will', 'going to',
+    'follow up', 'check', 'verify', 'test', 'update'
+])
+POSITIVE_WORDS_RE = _keyword_pattern(['thank', 'great', 'good', 'excellent', 'resolved', 'fixed', 'helpful'])
+NEGATIVE_WORDS_RE = _keyword_pattern(['bad', 'terrible', 'awful', 'broken', 'error', 'problem', 'issue'])
+
+# A sentence ends at .!? followed by whitespace or the end of the text, so
+# decimals ("3.14") and URLs ("example.com/x") stay inside one sentence
+SENTENCE_RE = re.compile(r"(\S.*?)\s*(?:[.!?]+(?=\s|$)|$)", re.DOTALL)
+
+def _iter_sentences(text: str):
+    """Lazily yield the sentences of text, without their terminators"""
+    for match in SENTENCE_RE.finditer(text):
+        yield match.group(1)
+
+def _top_k_indices(scores: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the highest scores in descending order, via O(n) selection"""
+    k = min(limit, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    top_idx = np.argpartition(-scores, k - 1)[:k]
+    return top_idx[np.argsort(-scores[top_idx])]
+
+# Rows of the int8 embedding matrix widened to float32 per block; sized so a
+# block stays cache resident while the whole matrix streams as int8
+EMBEDDING_SCORE_BLOCK_ROWS = 1024
+
+def _quantize_rows_int8(embeddings: np.ndarray):
+    """Symmetric per-row int8 quantization; returns (int8 matrix, float32 row scales)"""
+    scales = np.abs(embeddings).max(axis=1).astype(np.float32) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+    return quantized, scales
+
+# Rows fetched per batch when streaming the resolved-issue corpus
+RESOLVED_INDEX_FETCH_ROWS = 1000
+
+# Status changes bump a Redis version that is checked on every search; the
+# resolved set's row count and latest updated_at are re-read at most this
+# often to catch changes made outside update_issue_status
+RESOLVED_INDEX_DB_CHECK_INTERVAL = 60  # seconds
+
+# Query texts whose embeddings are kept for reuse; an int8 row is ~400 bytes.
+# Corpus rows are reused from the previous index instead, so the corpus is
+# never held twice.
+EMBEDDING_CACHE_MAX_ENTRIES = 10000
+
+def _embedding_key(text: str) -> bytes:
+    """Digest identifying a text's embedding"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+def _int8_rows_dot(quantized: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Dot product of every quantized row with a float query vector"""
+    query = query.astype(np.float32, copy=False)
+    scores = np.empty(len(quantized), dtype=np.float32)
+    for start in range(0, len(quantized), EMBEDDING_SCORE_BLOCK_ROWS):
+        block = quantized[start:start + EMBEDDING_SCORE_BLOCK_ROWS]
+        scores[start:start + len(block)] = block.astype(np.float32) @ query
+    return scores * scales
+
+# Generated recommendations are cached by a digest of everything that goes
+# into the prompt, so identical requests skip the OpenAI round trip
+RECOMMENDATION_CACHE_TTL = 86400 * 7  # seconds
+
+# Completions in flight per worker; recommendation requests fan out into
+# several concurrent calls, so this keeps bursts under the provider's limits
+OPENAI_MAX_CONCURRENT_REQUESTS = 10
+
+# Templates asked for per prompt, matching n on single-prompt completions
+RECOMMENDATION_CHOICES = 3
+
+def _recommendation_cache_key(context: str, message_type: str, tone: str) -> str:
+    """Content-addressed cache key for a recommendation prompt"""
+    digest = hashlib.blake2b(
+        f"{settings.OPENAI_MODEL}\x00{message_type}\x00{tone}\x00{context}".encode(),
+        digest_size=16
+    ).hexdigest()
+    return f"ai_rec:{digest}"
+
+# Characters of conversation text passed to the summarizer
+SUMMARY_INPUT_MAX_CHARS = 1000
+
+def _run_inference(fn, *args, **kwargs):
+    """
+    Call a model function under torch.inference_mode. Grad mode is
+    thread-local, so this must run inside the worker thread.
+    """
+    with torch.inference_mode():
+        return fn(*args, **kwargs)
+
+# Sentiment inputs are truncated by token count, bounding attention cost
+SENTIMENT_MAX_TOKENS = 128
+SENTIMENT_BATCH_SIZE = 32
+
+# Sentiment model labels
+SENTIMENT_LABELS = {
+    'LABEL_0': 'negative',
+    'LABEL_1': 'neutral',
+    'LABEL_2': 'positive'
+}
+
 class AIService:
-    def __init__(self):
+    def __init__(self, load_models: bool = True):
         self.openai_client = None
         self.severity_classifier = None
         self.sentence_transformer = None
         self.summarizer = None
         self.sentiment_analyzer = None
-        self._initialize_models()
+        # Index of resolved issues (int8 normalized embeddings, or TF-IDF when the
+        # sentence transformer is unavailable), rebuilt when the resolved set
+        # changes (tracked by the Redis version, row count and latest updated_at)
+        self._resolved_emb: Optional[np.ndarray] = None
+        self._resolved_emb_scales: Optional[np.ndarray] = None
+        self._resolved_emb_keys: List[bytes] = []
+        self._tfidf_vectorizer: Optional[TfidfVectorizer] = None
+        self._tfidf_matrix = None
+        self._resolved_ids: List[int] = []
+        self._resolved_resolution_times: List[Optional[float]] = []
+        self._resolved_version = None
+        self._resolved_db_version = None
+        self._resolved_db_checked_at = 0.0
+        self._resolved_lock = asyncio.Lock()
+        # int8 query embedding rows keyed by a digest of their text (LRU order)
+        self._embedding_cache: "OrderedDict[bytes, Tuple[np.ndarray, np.float32]]" = OrderedDict()
+        self._configure()
+        if load_models:
+            self._initialize_models()
+
+    def _configure(self):
+        """Set up the runtime, the OpenAI client and the rule-based classifier"""
+        # Unbounded intra-op threading slows int8 inference on many-core hosts
+        torch.set_num_threads(settings.AI_TORCH_THREADS or max(1, (os.cpu_count() or 2) // 2))
+        if settings.OPENAI_API_KEY:
+            # The client retries transient failures (rate limits, 5xx,
+            # timeouts) with exponential backoff; the per-attempt timeout
+            # keeps a stalled call from outliving the request budget
+            self.openai_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES
+            )
+        self._openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENT_REQUESTS)
+        self.severity_classifier = self._create_severity_classifier()
+
+    def _load_sentence_transformer(self):
+        return self._quantize_for_cpu(SentenceTransformer('all-MiniLM-L6-v2', device='cpu').eval())
+
+    def _load_summarizer(self):
+        summarizer = pipeline("summarization", model="t5-small", device=-1)
+        summarizer.model = self._quantize_for_cpu(summarizer.model.eval())
+        return summarizer
+
+    def _load_sentiment_analyzer(self):
+        analyzer = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment")
+        analyzer.model.eval()
+        return analyzer
 
     def _initialize_models(self):
         try:
-            if settings.OPENAI_API_KEY:
-                openai.api_key = settings.OPENAI_API_KEY
-                self.openai_client = openai
-            self.severity_classifier = self._create_severity_classifier()
-            self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
-            self.summarizer = pipeline("summarization", model="t5-small")
-            self.sentiment_analyzer = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment")
+            self.sentence_transformer = self._load_sentence_transformer()
+            self.summarizer = self._load_summarizer()
+            self.sentiment_analyzer = self._load_sentiment_analyzer()
             logger.info("AI models initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing AI models: {str(e)}")
-            self.severity_classifier = True
             self.sentence_transformer = None
             self.summarizer = None
             self.sentiment_analyzer = None
 
+    async def initialize_models_async(self):
+        """Load the three models concurrently in worker threads"""
+        loaders = {
+            "sentence_transformer": self._load_sentence_transformer,
+            "summarizer": self._load_summarizer,
+            "sentiment_analyzer": self._load_sentiment_analyzer
+        }
+        results = await asyncio.gather(
+            *(asyncio.to_thread(loader) for loader in loaders.values()),
+            return_exceptions=True
+        )
+        for name, result in zip(loaders, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error initializing {name}: {str(result)}")
+                result = None
+            setattr(self, name, result)
+        logger.info("AI models initialized")
+
+    def _quantize_for_cpu(self, model):
+        """Quantize a model's Linear layers to int8 in place when running on a supported CPU"""
+        if not settings.AI_QUANTIZE_MODELS:
+            return model
+        engines = torch.backends.quantized.supported_engines
+        engine = next((e for e in ("x86", "fbgemm", "qnnpack") if e in engines), None)
+        if engine is None:
+            logger.info("No int8 quantization engine available, keeping FP32 weights")
+            return model
+        torch.backends.quantized.engine = engine
+        model.eval()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
     def _create_severity_classifier(self):
         self.critical_keywords = [
             'urgent', 'critical', 'emergency', 'down', 'broken', 'failed',
@@ -53,18 +255,19 @@ class AIService:
             'important', 'priority', 'issue', 'problem', 'trouble',
             'difficulty', 'challenge', 'concern', 'matter', 'situation'
         ]
+        self._critical_re = _keyword_pattern(self.critical_keywords)
+        self._high_severity_re = _keyword_pattern(self.high_severity_keywords)
         return True
 
-    async def assess_severity(self, issue_text: str, customer_history: Dict[str, Any]) -> Dict[str, Any]:
+    def assess_severity(self, issue_text: str, customer_history: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            full_text = issue_text.lower()
             severity_score = 0
             reasoning = []
-            critical_count = sum(1 for keyword in self.critical_keywords if keyword in full_text)
+            critical_count = _count_keywords(self._critical_re, issue_text)
             if critical_count > 0:
                 severity_score += 3
                 reasoning.append(f"Contains {critical_count} critical keywords")
-            high_count = sum(1 for keyword in self.high_severity_keywords if keyword in full_text)
+            high_count = _count_keywords(self._high_severity_re, issue_text)
             if high_count > 0:
                 severity_score += 2
                 reasoning.append(f"Contains {high_count} high-severity keywords")
@@ -93,29 +296,173 @@ class AIService:
             logger.error(f"Error in severity assessment: {str(e)}")
             return {"severity": SeverityLevel.NORMAL, "confidence_score": 0.5, "reasoning": "Fallback"}
 
+    async def _resolved_index_version(self, db_session, refresh: bool = False):
+        """
+        Version of the resolved set: the shared Redis counter plus the row
+        count and latest updated_at, re-read at most every
+        RESOLVED_INDEX_DB_CHECK_INTERVAL seconds unless refresh is set.
+        """
+        now = time.monotonic()
+        if refresh or now - self._resolved_db_checked_at >= RESOLVED_INDEX_DB_CHECK_INTERVAL:
+            self._resolved_db_version = tuple((await db_session.execute(
+                select(func.count(Issue.id), func.max(Issue.updated_at))
+                .where(Issue.status.in_(RESOLVED_STATUSES))
+            )).one())
+            self._resolved_db_checked_at = now
+        return await cache_get(RESOLVED_INDEX_VERSION_KEY), self._resolved_db_version
+    
+    async def _refresh_resolved_index(self, db_session):
+        """Rebuild the resolved-issue index if any were resolved or edited since the last build"""
+        resolved = Issue.status.in_(RESOLVED_STATUSES)
+        version = await self._resolved_index_version(db_session)
+        if version == self._resolved_version:
+            return
+        
+        async with self._resolved_lock:
+            # Re-read the table so the stored version matches the rebuilt corpus
+            version = await self._resolved_index_version(db_session, refresh=True)
+            if version == self._resolved_version:
+                return
+            # Stream the corpus in batches over a server-side cursor so only
+            # the concatenated texts are held, not every row as well
+            result = await db_session.stream(
+                select(Issue.id, Issue.title, Issue.description, Issue.resolution_time)
+                .where(resolved)
+                .execution_options(yield_per=RESOLVED_INDEX_FETCH_ROWS)
+            )
+            ids = []
+            texts = []
+            resolution_times = []
+            async for partition in result.partitions():
+                for row in partition:
+                    ids.append(row.id)
+                    texts.append(f"{row.title} {row.description}")
+                    resolution_times.append(
+                        float(row.resolution_time) if row.resolution_time is not None else None
+                    )
+            
+            emb = emb_scales = vectorizer = tfidf_matrix = None
+            emb_keys = []
+            if texts:
+                if self.sentence_transformer:
+                    emb, emb_scales, emb_keys = await self._encode_corpus(texts)
+                else:
+                    # Fallback when the sentence transformer failed to load:
+                    # fit TF-IDF once per corpus version instead of per query
+                    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 2))
+                    tfidf_matrix = (await asyncio.to_thread(vectorizer.fit_transform, texts)).tocsr()
+            self._resolved_emb = emb
+            self._resolved_emb_scales = emb_scales
+            self._resolved_emb_keys = emb_keys
+            self._tfidf_vectorizer = vectorizer
+            self._tfidf_matrix = tfidf_matrix
+            self._resolved_ids = ids
+            self._resolved_resolution_times = resolution_times
+            self._resolved_version = version
+    
+    async def _encode_texts(self, texts: List[str]):
+        """Encode texts as int8-quantized normalized embeddings"""
+        embeddings = await asyncio.to_thread(
+            _run_inference, self.sentence_transformer.encode, texts,
+            batch_size=64, normalize_embeddings=True, convert_to_numpy=True
+        )
+        return _quantize_rows_int8(embeddings)
+    
+    async def _encode_corpus(self, texts: List[str]):
+        """
+        Encode the resolved-issue corpus, copying rows for texts already in
+        the current index so a rebuild only runs the model on new texts.
+        
+        Args:
+            texts: Corpus texts to embed
+            
+        Returns:
+            Tuple of (int8 matrix, float32 row scales, text digests) in input order
+        """
+        keys = [_embedding_key(text) for text in texts]
+        previous = {}
+        if self._resolved_emb is not None:
+            previous = {key: i for i, key in enumerate(self._resolved_emb_keys)}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in previous:
+                missing.setdefault(key, text)
+        
+        rows = [(self._resolved_emb, self._resolved_emb_scales, previous.get(key)) for key in keys]
+        if missing:
+            quantized, scales = await self._encode_texts(list(missing.values()))
+            position = {key: i for i, key in enumerate(missing)}
+            rows = [
+                (quantized, scales, position[key]) if key in position else row
+                for key, row in zip(keys, rows)
+            ]
+        
+        return (
+            np.stack([matrix[i] for matrix, _, i in rows]),
+            np.array([row_scales[i] for _, row_scales, i in rows], dtype=np.float32),
+            keys
+        )
+    
+    async def _encode_cached(self, texts: List[str]):
+        """
+        Encode query texts as int8-quantized normalized embeddings, reusing
+        rows already encoded for identical text so only new texts hit the model.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Tuple of (int8 matrix, float32 row scales) in input order
+        """
+        keys = [_embedding_key(text) for text in texts]
+        cache = self._embedding_cache
+        # Hits are taken before awaiting so concurrent evictions can't drop them
+        found = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in cache:
+                cache.move_to_end(key)
+                found[key] = cache[key]
+            else:
+                missing.setdefault(key, text)
+        
+        if missing:
+            quantized, scales = await self._encode_texts(list(missing.values()))
+            for i, key in enumerate(missing):
+                found[key] = cache[key] = (quantized[i], scales[i])
+        
+        rows = [found[key] for key in keys]
+        while len(cache) > EMBEDDING_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+        
+        return (
+            np.stack([row[0] for row in rows]),
+            np.array([row[1] for row in rows], dtype=np.float32)
+        )
+    
     async def find_similar_issues(self, issue_text: str, db_session, limit: int = 5) -> List[Dict[str, Any]]:
         try:
-            resolved_issues = db_session.query(Issue).filter(
-                Issue.status.in_(["RESOLVED", "CLOSED"])
-            ).all()
-            if not resolved_issues:
+            await self._refresh_resolved_index(db_session)
+            if self._resolved_emb is not None:
+                query_i8, query_scale = await self._encode_cached([issue_text])
+                query = query_i8[0].astype(np.float32) * query_scale[0]
+                similarities = _int8_rows_dot(self._resolved_emb, self._resolved_emb_scales, query)
+            elif self._tfidf_matrix is not None:
+                # TF-IDF rows are L2-normalized, so the dot product is the cosine
+                query = self._tfidf_vectorizer.transform([issue_text])
+                similarities = linear_kernel(query, self._tfidf_matrix).ravel()
+            else:
                 return []
-            issue_texts = [issue.title + " " + issue.description for issue in resolved_issues]
-            issue_texts.append(issue_text)
-            vectorizer = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 2))
-            tfidf_matrix = vectorizer.fit_transform(issue_texts)
-            similarities = cosine_similarity(tfidf_matrix[-1:], tfidf_matrix[:-1])[0]
-            similar_indices = np.argsort(similarities)[::-1][:limit]
-            similar_issues = []
-            for idx in similar_indices:
-                issue = resolved_issues[idx]
-                similar_issues.append({
-                    "issue_id": issue.id,
+            top_idx = _top_k_indices(similarities, limit)
+            return [
+                {
+                    "issue_id": self._resolved_ids[idx],
                     "similarity_score": float(similarities[idx]),
-                    "resolution": getattr(issue, "resolution", None),
-                    "resolution_time": getattr(issue, "resolution_time", None)
-                })
-            return similar_issues
+                    "resolution": None,
+                    "resolution_time": self._resolved_resolution_times[idx]
+                }
+                for idx in top_idx
+            ]
         except Exception as e:
             logger.error(f"Error finding similar issues: {str(e)}")
             return []
@@ -124,17 +471,22 @@ class AIService:
         try:
             if not self.openai_client:
                 return []
+            cache_key = _recommendation_cache_key(context, message_type, tone)
+            cached = await cache_get_json(cache_key)
+            if cached is not None:
+                return cached["items"]
             prompt = self._create_recommendation_prompt(context, message_type, tone)
-            response = self.openai_client.ChatCompletion.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a helpful support assistant. Generate professional, empathetic message templates."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.7,
-                n=3
-            )
+            async with self._openai_semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful support assistant. Generate professional, empathetic message templates."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=300,
+                    temperature=0.7,
+                    n=3
+                )
             recommendations = []
             for choice in response.choices:
                 template = choice.message.content.strip()
@@ -145,11 +497,106 @@ class AIService:
                         "tone": tone,
                         "confidence_score": 0.85
                     })
+            if recommendations:
+                await cache_set_json(cache_key, {"items": recommendations}, ttl=RECOMMENDATION_CACHE_TTL)
             return recommendations
         except Exception as e:
             logger.error(f"Error generating recommendations: {str(e)}")
             return []
 
+    async def generate_recommendations_batch(self, issue_id: int,
+                                             requests: List[Tuple[str, str, str]]) -> List[List[Dict[str, Any]]]:
+        """
+        Generate recommendations for several prompts with one completion.
+        
+        Prompts already in the recommendation cache are served from it; the
+        rest are sent together as a single JSON-structured prompt, so the
+        system message and per-request overhead are paid once. Prompts the
+        batched answer does not cover fall back to single completions.
+        
+        Args:
+            issue_id: Issue the recommendations are for
+            requests: (context, message_type, tone) for each prompt
+            
+        Returns:
+            Recommendations for each request, in request order
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in requests]
+        try:
+            if not self.openai_client or not requests:
+                return results
+            cache_keys = [_recommendation_cache_key(*request) for request in requests]
+            cached = await cache_mget_json(cache_keys)
+            misses = []
+            for i, value in enumerate(cached):
+                if value is not None:
+                    results[i] = value["items"]
+                else:
+                    misses.append(i)
+            if not misses:
+                return results
+            if len(misses) == 1:
+                results[misses[0]] = await self.generate_recommendations(issue_id, *requests[misses[0]])
+                return results
+            
+            prompt_parts = [
+                f"Write {RECOMMENDATION_CHOICES} alternative message templates for each request below. "
+                f"Reply with a JSON object mapping each request number to an array of "
+                f"{RECOMMENDATION_CHOICES} template strings."
+            ]
+            for n, i in enumerate(misses, start=1):
+                prompt_parts.append(f"{n}. {self._create_recommendation_prompt(*requests[i])}")
+            async with self._openai_semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful support assistant. Generate professional, empathetic message templates."},
+                        {"role": "user", "content": "\n".join(prompt_parts)}
+                    ],
+                    max_tokens=300 * RECOMMENDATION_CHOICES * len(misses),
+                    temperature=0.7,
+                    response_format={"type": "json_object"}
+                )
+            try:
+                answers = json.loads(response.choices[0].message.content)
+            except (TypeError, ValueError):
+                answers = {}
+            if not isinstance(answers, dict):
+                answers = {}
+            
+            to_cache = {}
+            unanswered = []
+            for n, i in enumerate(misses, start=1):
+                context, message_type, tone = requests[i]
+                templates = answers.get(str(n))
+                recommendations = [
+                    {
+                        "template": template.strip(),
+                        "type": message_type,
+                        "tone": tone,
+                        "confidence_score": 0.85
+                    }
+                    for template in (templates if isinstance(templates, list) else [])
+                    if isinstance(template, str) and template.strip()
+                ]
+                if recommendations:
+                    results[i] = recommendations
+                    to_cache[cache_keys[i]] = {"items": recommendations}
+                else:
+                    unanswered.append(i)
+            if to_cache:
+                await cache_mset_json(to_cache, ttl=RECOMMENDATION_CACHE_TTL)
+            if unanswered:
+                retried = await asyncio.gather(*(
+                    self.generate_recommendations(issue_id, *requests[i]) for i in unanswered
+                ))
+                for i, recommendations in zip(unanswered, retried):
+                    results[i] = recommendations
+            return results
+        except Exception as e:
+            logger.error(f"Error generating batched recommendations: {str(e)}")
+            return results
+
     def _create_recommendation_prompt(self, context: str, message_type: str, tone: str) -> str:
         prompts = {
             "greeting": f"Generate a {tone} greeting message for a support issue. Context: {context}",
@@ -160,16 +607,29 @@ class AIService:
 
     async def summarize_conversation(self, conversation_id: int, db_session) -> Dict[str, Any]:
         try:
-            messages = db_session.query(Conversation).filter(
-                Conversation.issue_id == conversation_id
-            ).order_by(Conversation.created_at).all()
+            result = await db_session.execute(
+                select(Conversation.message).where(
+                    Conversation.issue_id == conversation_id
+                ).order_by(Conversation.created_at)
+            )
+            messages = result.scalars().all()
             if not messages:
                 return {"error": "No messages found for conversation"}
-            full_conversation = " ".join([msg.message for msg in messages])
-            if len(full_conversation) > 1000:
-                full_conversation = full_conversation[:1000] + "..."
+            # Join only as many messages as fit under the input cap
+            parts = []
+            total = -1
+            for message in messages:
+                parts.append(message)
+                total += len(message) + 1
+                if total > SUMMARY_INPUT_MAX_CHARS:
+                    break
+            full_conversation = " ".join(parts)
+            if total > SUMMARY_INPUT_MAX_CHARS:
+                full_conversation = full_conversation[:SUMMARY_INPUT_MAX_CHARS] + "..."
             if self.summarizer:
-                summary_result = self.summarizer(full_conversation, max_length=150, min_length=50)
+                summary_result = await asyncio.to_thread(
+                    _run_inference, self.summarizer, full_conversation, max_length=150, min_length=50, truncation=True
+                )
                 summary = summary_result[0]['summary_text']
             else:
                 summary = full_conversation[:150] + "..."
@@ -192,15 +652,15 @@ class AIService:
     
     def _fallback_summarization(self, text: str) -> str:
         """Fallback summarization when ML model is unavailable"""
-        sentences = text.split('.')
+        # Only the first few sentences are needed to decide on the short path
+        sentences = list(islice(_iter_sentences(text), 4))
         if len(sentences) <= 3:
             return text
         
         # Simple extractive summarization
-        important_sentences = []
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in ['issue', 'problem', 'resolved', 'fixed', 'error']):
-                important_sentences.append(sentence)
+        important_sentences = list(islice(
+            (sentence for sentence in _iter_sentences(text) if SUMMARY_KEYWORDS_RE.search(sentence)), 3
+        ))
         
         if important_sentences:
             return '. '.join(important_sentences[:3]) + '.'
@@ -209,68 +669,97 @@ class AIService:
     
     def _extract_key_points(self, text: str) -> List[str]:
         """Extract key points from conversation"""
-        key_points = []
-        
-        # Simple keyword-based extraction
-        keywords = ['issue', 'problem', 'error', 'resolved', 'fixed', 'solution', 'help']
-        
-        sentences = text.split('.')
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in keywords):
-                key_points.append(sentence.strip())
-        
-        return key_points[:5]  # Limit to 5 key points
+        return self._extract_highlights(text, action_limit=0)[0]
     
     def _extract_action_items(self, text: str) -> List[str]:
         """Extract action items from conversation"""
-        action_items = []
+        return self._extract_highlights(text, key_point_limit=0)[1]
+    
+    def _extract_highlights(self, text: str, key_point_limit: int = 5,
+                            action_limit: int = 3) -> Tuple[List[str], List[str]]:
+        """
+        Extract key points and action items in a single pass over the sentences,
+        stopping once both limits are reached.
         
-        # Look for action-oriented phrases
-        action_phrases = [
-            'need to', 'should', 'must', 'will', 'going to',
-            'follow up', 'check', 'verify', 'test', 'update'
-        ]
+        Args:
+            text: Conversation text
+            key_point_limit: Maximum number of key points
+            action_limit: Maximum number of action items
+            
+        Returns:
+            Tuple of (key points, action items)
+        """
+        key_points = []
+        action_items = []
         
-        sentences = text.split('.')
-        for sentence in sentences:
-            if any(phrase in sentence.lower() for phrase in action_phrases):
+        for sentence in _iter_sentences(text):
+            if len(key_points) < key_point_limit and KEY_POINT_KEYWORDS_RE.search(sentence):
+                key_points.append(sentence.strip())
+            if len(action_items) < action_limit and ACTION_PHRASES_RE.search(sentence):
                 action_items.append(sentence.strip())
+            if len(key_points) >= key_point_limit and len(action_items) >= action_limit:
+                break
         
-        return action_items[:3]  # Limit to 3 action items
+        return key_points, action_items
     
-    async def _analyze_sentiment(self, text: str) -> str:
+    def _analyze_sentiment(self, text: str) -> str:
         """Analyze sentiment of conversation"""
+        return self._analyze_sentiment_batch([text])[0]
+    
+    def _analyze_sentiment_batch(self, texts: List[str]) -> List[str]:
+        """
+        Analyze the sentiment of several texts with one model call.
+        
+        Args:
+            texts: Texts to classify
+            
+        Returns:
+            Sentiment labels in input order
+        """
+        if not texts:
+            return []
         try:
             if self.sentiment_analyzer:
-                result = self.sentiment_analyzer(text[:500])  # Limit text length
-                label = result[0]['label']
-                
-                # Map sentiment labels
-                sentiment_map = {
-                    'LABEL_0': 'negative',
-                    'LABEL_1': 'neutral',
-                    'LABEL_2': 'positive'
-                }
-                
-                return sentiment_map.get(label, 'neutral')
-            else:
-                # Simple rule-based sentiment analysis
-                positive_words = ['thank', 'great', 'good', 'excellent', 'resolved', 'fixed', 'helpful']
-                negative_words = ['bad', 'terrible', 'awful', 'broken', 'error', 'problem', 'issue']
-                
-                text_lower = text.lower()
-                positive_count = sum(1 for word in positive_words if word in text_lower)
-                negative_count = sum(1 for word in negative_words if word in text_lower)
-                
-                if positive_count > negative_count:
-                    return 'positive'
-                elif negative_count > positive_count:
-                    return 'negative'
-                else:
-                    return 'neutral'
-                    
+                return self._classify_sentiment(texts)
+            return [self._rule_based_sentiment(text) for text in texts]
         except Exception as e:
             logger.error(f"Error analyzing sentiment: {str(e)}")
+            return ['neutral'] * len(texts)
+    
+    def _classify_sentiment(self, texts: List[str]) -> List[str]:
+        """
+        Run the sentiment model directly on token-truncated batches,
+        bypassing the pipeline's per-item pre/post-processing.
+        """
+        tokenizer = self.sentiment_analyzer.tokenizer
+        model = self.sentiment_analyzer.model
+        id2label = model.config.id2label
+        
+        # Batch texts of similar length together to minimize padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        labels: List[str] = [''] * len(texts)
+        for start in range(0, len(order), SENTIMENT_BATCH_SIZE):
+            batch = order[start:start + SENTIMENT_BATCH_SIZE]
+            encoded = tokenizer(
+                [texts[i] for i in batch], truncation=True, max_length=SENTIMENT_MAX_TOKENS,
+                padding=True, return_tensors="pt"
+            )
+            with torch.inference_mode():
+                predictions = model(**encoded).logits.argmax(-1).tolist()
+            for i, prediction in zip(batch, predictions):
+                labels[i] = SENTIMENT_LABELS.get(id2label[prediction], 'neutral')
+        return labels
+    
+    def _rule_based_sentiment(self, text: str) -> str:
+        """Simple rule-based sentiment analysis used without the model"""
+        positive_count = _count_keywords(POSITIVE_WORDS_RE, text)
+        negative_count = _count_keywords(NEGATIVE_WORDS_RE, text)
+        
+        if positive_count > negative_count:
+            return 'positive'
+        elif negative_count > positive_count:
+            return 'negative'
+        else:
             return 'neutral'
     
     async def analyze_customer_sentiment(self, customer_id: int, db_session) -> Dict[str, Any]:
@@ -286,30 +775,25 @@ class AIService:
         """
         try:
             # Get recent conversations for customer
-            recent_issues = db_session.query(Issue).filter(
-                Issue.customer_id == customer_id,
-                Issue.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).all()
+            result = await db_session.execute(
+                select(Issue).options(selectinload(Issue.conversations)).where(
+                    Issue.customer_id == customer_id,
+                    Issue.created_at >= datetime.utcnow() - timedelta(days=30)
+                )
+            )
+            recent_issues = result.scalars().all()
+            
+            messages = [conv.message for issue in recent_issues for conv in issue.conversations]
             
-            all_sentiments = []
-            for issue in recent_issues:
-                conversations = db_session.query(Conversation).filter(
-                    Conversation.issue_id == issue.id
-                ).all()
-                
-                for conv in conversations:
-                    sentiment = await self._analyze_sentiment(conv.message)
-                    all_sentiments.append(sentiment)
+            # One batched model call for every message, off the event loop
+            all_sentiments = await asyncio.to_thread(_run_inference, self._analyze_sentiment_batch, messages)
             
             if not all_sentiments:
                 return {"overall_sentiment": "neutral", "sentiment_score": 0.0}
             
             # Calculate overall sentiment
-            sentiment_counts = {
-                'positive': all_sentiments.count('positive'),
-                'neutral': all_sentiments.count('neutral'),
-                'negative': all_sentiments.count('negative')
-            }
+            counts = Counter(all_sentiments)
+            sentiment_counts = {label: counts[label] for label in ('positive', 'neutral', 'negative')}
             
             total = len(all_sentiments)
             sentiment_score = (sentiment_counts['positive'] - sentiment_counts['negative']) / total
@@ -346,34 +830,69 @@ class AIService:
         """
         try:
             patterns = []
+            now = datetime.utcnow()
+            recent_cutoff = now - timedelta(days=7)
+            unattended_cutoff = now - timedelta(hours=24)
+            
+            # Recent issues for the customer that share a category; aliased
+            # so it isn't correlated against the outer issues table
+            recent = aliased(Issue)
+            repeated_categories = (
+                select(recent.category)
+                .where(
+                    recent.customer_id == customer_id,
+                    recent.created_at >= recent_cutoff,
+                    recent.category.isnot(None),
+                    recent.category != ""
+                )
+                .group_by(recent.category)
+                .having(func.count() > 1)
+                .exists()
+            )
             
-            # Get customer's recent issues
-            recent_issues = db_session.query(Issue).filter(
-                Issue.customer_id == customer_id,
-                Issue.created_at >= datetime.utcnow() - timedelta(days=7)
-            ).all()
+            # All three signals in one aggregate query, no rows hydrated
+            recent_count, critical_unresolved, has_repeated = (await db_session.execute(
+                select(
+                    func.sum(case((Issue.created_at >= recent_cutoff, 1), else_=0)),
+                    func.sum(case((and_(
+                        Issue.severity == "HIGH",
+                        Issue.is_open == True,
+                        Issue.created_at <= unattended_cutoff
+                    ), 1), else_=0)),
+                    repeated_categories
+                ).where(Issue.customer_id == customer_id)
+            )).one()
             
-            if len(recent_issues) >= 3:
+            if int(recent_count or 0) >= 3:
                 patterns.append("Multiple issues in short time period")
             
-            # Check for unresolved critical issues
-            critical_unresolved = db_session.query(Issue).filter(
-                Issue.customer_id == customer_id,
-                Issue.severity == "HIGH",
-                Issue.status.in_(["OPEN", "IN_PROGRESS"]),
-                Issue.created_at <= datetime.utcnow() - timedelta(hours=24)
-            ).count()
-            
+            critical_unresolved = int(critical_unresolved or 0)
             if critical_unresolved > 0:
                 patterns.append(f"{critical_unresolved} critical issues unresolved for >24h")
             
-            # Check for repeated issues
-            issue_categories = [issue.category for issue in recent_issues if issue.category]
-            if len(set(issue_categories)) < len(issue_categories):
+            if has_repeated:
                 patterns.append("Repeated issue categories detected")
             
             return patterns
             
         except Exception as e:
             logger.error(f"Error detecting critical patterns: {str(e)}")
-            return [] 
\ No newline at end of file
+            return [] 
+
+_ai_service: Optional[AIService] = None
+
+def get_ai_service() -> AIService:
+    """Process-wide AIService, so models are loaded once per worker"""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
+
+async def init_ai_service() -> AIService:
+    """Build the process-wide AIService, loading its models concurrently"""
+    global _ai_service
+    if _ai_service is None:
+        service = AIService(load_models=False)
+        await service.initialize_models_async()
+        _ai_service = service
+    return _ai_service
@@ -1,34 +1,96 @@
+import asyncio
 import logging
-import json
+import time
+import numpy as np
+from collections import Counter
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, lambda_stmt, or_, func, select, text, update
 
-from app.core.database import Issue, Customer, Conversation, Recommendation, ConversationSummary, SimilarIssue
+from app.core.database import SessionLocal, RESOLVED_STATUSES, Issue, Customer, CustomerStats, Conversation, Recommendation, ConversationSummary, SimilarIssue
+from app.core.customer_stats import refresh_customer_stats
 from app.models.schemas import IssueCreate, IssueAnalysis, CustomerHistory, SeverityLevel, IssueStatus
-from app.services.ai_service import AIService
-from app.core.cache import cache_set, cache_get, cache_delete
+from app.services.ai_service import AIService, get_ai_service
+from app.core.cache import (
+    cache_delete, cache_delete_many, cache_get_json, cache_set_json, cache_tag_key, bump_resolved_index_version,
+    invalidate_cached_responses, generate_issue_analysis_cache_key
+)
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on rows returned by the critical issues alert
+CRITICAL_ISSUES_LIMIT = 100
+
+# The critical set is shared by every caller and tagged like the endpoint
+# response, so status changes invalidate both; the short TTL bounds how late
+# an issue crossing the 24 hour mark shows up
+CRITICAL_ISSUES_CACHE_KEY = "critical_issues:list"
+CRITICAL_ISSUES_CACHE_TTL = 30
+
+# Matches the customer history TTL the analysis is built from
+ISSUE_ANALYSIS_CACHE_TTL = 1800
+
+# In-flight customer history loads: customer_id -> [lock, holders and waiters]
+_customer_history_loads: Dict[int, List[Any]] = {}
+
+@asynccontextmanager
+async def _single_flight(loads: Dict[Any, List[Any]], key: Any):
+    """Serialize concurrent loads of one key within this worker"""
+    entry = loads.get(key)
+    if entry is None:
+        entry = loads[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del loads[key]
+
 class IssueService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, ai_service: Optional[AIService] = None):
         self.db = db
-        self.ai_service = AIService()
+        self.ai_service = ai_service or get_ai_service()
 
-    async def analyze_new_issue(self, issue_data: IssueCreate, ai_service: AIService) -> IssueAnalysis:
+    async def analyze_new_issue(self, issue_data: IssueCreate) -> IssueAnalysis:
         try:
-            start_time = datetime.utcnow()
-            customer_history = await self._get_customer_history(issue_data.customer_id)
+            ai_service = self.ai_service
+            # Repeat analyses of the same payload are served from cache
+            cache_key = generate_issue_analysis_cache_key(
+                issue_data.customer_id, issue_data.title, issue_data.description
+            )
+            cached_analysis = await cache_get_json(cache_key)
+            if cached_analysis:
+                return IssueAnalysis.model_validate(cached_analysis)
+            
+            start_time = time.perf_counter()
             issue_text = f"{issue_data.title} {issue_data.description}"
-            severity_analysis = await ai_service.assess_severity(issue_text, customer_history)
-            similar_issues = await ai_service.find_similar_issues(issue_text, self.db)
-            critical_patterns = await ai_service.detect_critical_patterns(issue_data.customer_id, self.db)
+            
+            # Only severity needs the customer history, so the history, the
+            # similarity search and the pattern check run concurrently. An
+            # AsyncSession can't run statements concurrently, so the two AI
+            # lookups each use a short-lived session of their own.
+            async def find_similar_issues():
+                async with SessionLocal() as db:
+                    return await ai_service.find_similar_issues(issue_text, db)
+            
+            async def detect_critical_patterns():
+                async with SessionLocal() as db:
+                    return await ai_service.detect_critical_patterns(issue_data.customer_id, db)
+            
+            customer_history, similar_issues, critical_patterns = await asyncio.gather(
+                self._get_customer_history(issue_data.customer_id),
+                find_similar_issues(),
+                detect_critical_patterns()
+            )
+            severity_analysis = ai_service.assess_severity(issue_text, customer_history)
             recommended_actions = self._generate_recommended_actions(
                 severity_analysis, customer_history, similar_issues, critical_patterns
             )
-            processing_time = (datetime.utcnow() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             analysis = IssueAnalysis(
                 issue_id=issue_data.customer_id,
                 severity_assessment=severity_analysis["severity"],
@@ -39,8 +101,9 @@ class IssueService:
                 recommended_actions=recommended_actions,
                 processing_time=processing_time
             )
-            cache_key = f"issue_analysis:{issue_data.customer_id}:{datetime.utcnow().timestamp()}"
-            cache_set(cache_key, json.dumps(analysis.dict()), ttl=3600)
+            # Tagged with the customer's history so status changes clear it too
+            await cache_set_json(cache_key, analysis.model_dump(mode="json"), ttl=ISSUE_ANALYSIS_CACHE_TTL)
+            await cache_tag_key(f"customer_history:{issue_data.customer_id}", cache_key, ttl=ISSUE_ANALYSIS_CACHE_TTL)
             logger.info(f"Issue analysis completed in {processing_time}s")
             return analysis
         except Exception as e:
@@ -60,66 +123,118 @@ class IssueService:
         try:
             # Check cache first
             cache_key = f"customer_history:{customer_id}"
-            cached_data = cache_get(cache_key)
+            cached_data = await cache_get_json(cache_key)
             
             if cached_data:
-                return json.loads(cached_data)
-            
-            # Get customer data
-            customer = self.db.query(Customer).filter(Customer.id == customer_id).first()
-            if not customer:
-                return self._get_default_customer_history()
-            
-            # Get recent issues
-            recent_issues = self.db.query(Issue).filter(
-                Issue.customer_id == customer_id,
-                Issue.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).all()
-            
-            # Calculate metrics
-            total_issues = len(recent_issues)
-            resolved_issues = len([i for i in recent_issues if i.status in ["RESOLVED", "CLOSED"]])
-            critical_issues = len([i for i in recent_issues if i.severity == "HIGH"])
-            
-            # Calculate average resolution time
-            resolved_with_time = [i for i in recent_issues if i.resolution_time and i.status in ["RESOLVED", "CLOSED"]]
-            avg_resolution_time = sum(i.resolution_time for i in resolved_with_time) / len(resolved_with_time) if resolved_with_time else 0
-            
-            # Get recent issue details
-            recent_issue_details = []
-            for issue in recent_issues[-5:]:  # Last 5 issues
-                recent_issue_details.append({
-                    "issue_id": issue.id,
-                    "title": issue.title,
-                    "status": issue.status,
-                    "severity": issue.severity,
-                    "resolution_time": float(issue.resolution_time) if issue.resolution_time else None,
-                    "created_at": issue.created_at.isoformat()
-                })
-            
-            # Detect issue patterns
-            issue_patterns = self._detect_issue_patterns(recent_issues)
-            
-            history = {
-                "total_issues": total_issues,
-                "resolved_issues": resolved_issues,
-                "critical_issues": critical_issues,
-                "avg_resolution_time": f"{avg_resolution_time:.1f} hours",
-                "vip_status": customer.vip_status,
-                "recent_issues": recent_issue_details,
-                "issue_patterns": issue_patterns,
-                "customer_satisfaction": self._calculate_satisfaction_score(customer_id)
-            }
-            
-            # Cache the result
-            cache_set(cache_key, json.dumps(history), ttl=1800)  # 30 minutes
-            
-            return history
+                return cached_data
+            
+            # Concurrent misses for one customer wait for a single load,
+            # then find the cache filled when they re-check it
+            async with _single_flight(_customer_history_loads, customer_id):
+                cached_data = await cache_get_json(cache_key)
+                if cached_data:
+                    return cached_data
+                
+                history = await self._load_customer_history(customer_id)
+                if history is None:
+                    return self._get_default_customer_history()
+                
+                # Cache the result
+                await cache_set_json(cache_key, history, ttl=1800)  # 30 minutes
+                
+                return history
             
         except Exception as e:
             logger.error(f"Error getting customer history: {str(e)}")
             return self._get_default_customer_history()
     
+    async def _load_customer_history(self, customer_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Build customer history from the database.
+        
+        Args:
+            customer_id: Customer ID
+            
+        Returns:
+            Customer history data, or None if the customer does not exist
+        """
+        # Get customer data
+        customer = await self.db.get(Customer, customer_id)
+        if not customer:
+            return None
+        
+        # The hot queries below are lambda statements: SQLAlchemy builds
+        # and caches each one once, later calls only rebind the closure
+        # variables (customer_id, cutoff) as parameters
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        recent_filter = and_(Issue.customer_id == customer_id, Issue.created_at >= cutoff)
+        resolved_states = Issue.status.in_(RESOLVED_STATUSES)
+        
+        # Calculate metrics from the pre-aggregated row; customers without
+        # one (no recent issues, or not refreshed yet) are aggregated live
+        stats = await self.db.get(CustomerStats, customer_id)
+        if stats is not None:
+            total_issues = stats.total_issues
+            resolved_issues = stats.resolved_issues
+            critical_issues = stats.critical_issues
+            avg_resolution_time = float(stats.avg_resolution_time or 0)
+        else:
+            result = await self.db.execute(
+                select(
+                    func.count().label("total"),
+                    func.count(case((resolved_states, 1))).label("resolved"),
+                    func.count(case((Issue.severity == "HIGH", 1))).label("critical"),
+                    func.avg(case((resolved_states, Issue.resolution_time))).label("avg_resolution_time")
+                ).select_from(Issue).where(recent_filter)
+            )
+            live_stats = result.one()
+            total_issues = live_stats.total
+            resolved_issues = live_stats.resolved
+            critical_issues = live_stats.critical
+            avg_resolution_time = float(live_stats.avg_resolution_time or 0)
+        
+        # Get recent issue details
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(
+                Issue.id, Issue.title, Issue.status, Issue.severity,
+                Issue.resolution_time, Issue.created_at
+            )
+            .where(Issue.customer_id == customer_id, Issue.created_at >= cutoff)
+            .order_by(Issue.created_at.desc(), Issue.id.desc())
+            .limit(5)
+        ))
+        recent_issue_details = []
+        for issue in reversed(result.all()):  # Last 5 issues, oldest first
+            recent_issue_details.append({
+                "issue_id": issue.id,
+                "title": issue.title,
+                "status": issue.status,
+                "severity": issue.severity,
+                "resolution_time": float(issue.resolution_time) if issue.resolution_time else None,
+                "created_at": issue.created_at.isoformat()
+            })
+        
+        # Detect issue patterns from just the columns they look at
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(Issue.category, Issue.severity, Issue.created_at)
+            .where(Issue.customer_id == customer_id, Issue.created_at >= cutoff)
+            .order_by(Issue.created_at)
+        ))
+        issue_patterns = self._detect_issue_patterns(result.all())
+        
+        history = {
+            "total_issues": total_issues,
+            "resolved_issues": resolved_issues,
+            "critical_issues": critical_issues,
+            "avg_resolution_time": f"{avg_resolution_time:.1f} hours",
+            "vip_status": customer.vip_status,
+            "recent_issues": recent_issue_details,
+            "issue_patterns": issue_patterns,
+            "customer_satisfaction": self._calculate_satisfaction_score(customer_id)
+        }
+        
+        return history
+    
     def _get_default_customer_history(self) -> Dict[str, Any]:
         """Return default customer history for new customers"""
         return {
@@ -133,38 +248,31 @@ class IssueService:
             "customer_satisfaction": None
         }
     
-    def _detect_issue_patterns(self, issues: List[Issue]) -> List[str]:
-        """Detect patterns in customer issues"""
+    def _detect_issue_patterns(self, issues: List[Any]) -> List[str]:
+        """Detect patterns in customer issues (rows with category, severity and created_at)"""
         patterns = []
         
         if not issues:
             return patterns
         
         # Check for repeated categories
-        categories = [issue.category for issue in issues if issue.category]
-        category_counts = {}
-        for category in categories:
-            category_counts[category] = category_counts.get(category, 0) + 1
-        
+        category_counts = Counter(issue.category for issue in issues if issue.category)
         repeated_categories = [cat for cat, count in category_counts.items() if count > 1]
         if repeated_categories:
             patterns.append(f"Repeated categories: {', '.join(repeated_categories)}")
         
         # Check for severity patterns
-        high_severity_count = len([i for i in issues if i.severity == "HIGH"])
+        high_severity_count = sum(1 for i in issues if i.severity == "HIGH")
         if high_severity_count > 2:
             patterns.append("Multiple high-severity issues")
         
         # Check for timing patterns
         if len(issues) >= 3:
-            # Check if issues are clustered in time
-            sorted_issues = sorted(issues, key=lambda x: x.created_at)
-            for i in range(len(sorted_issues) - 2):
-                time_diff1 = (sorted_issues[i+1].created_at - sorted_issues[i].created_at).total_seconds() / 3600
-                time_diff2 = (sorted_issues[i+2].created_at - sorted_issues[i+1].created_at).total_seconds() / 3600
-                if time_diff1 < 24 and time_diff2 < 24:  # Issues within 24 hours
-                    patterns.append("Issues clustered in time")
-                    break
+            # Issues are clustered when two consecutive gaps are both under 24 hours
+            created = np.sort(np.array([i.created_at for i in issues], dtype="datetime64[us]"))
+            short_gaps = np.diff(created) < np.timedelta64(24, "h")
+            if np.any(short_gaps[:-1] & short_gaps[1:]):
+                patterns.append("Issues clustered in time")
         
         return patterns
     
@@ -246,25 +354,36 @@ class IssueService:
             List of critical issues
         """
         try:
-            # Get issues that meet critical criteria
-            critical_issues = self.db.query(Issue).filter(
-                and_(
+            cached_issues = await cache_get_json(CRITICAL_ISSUES_CACHE_KEY)
+            if cached_issues is not None:
+                return cached_issues
+            
+            # Filter, order and cap the critical set in SQL; the customer
+            # columns come from the same join, and only the columns the alert
+            # shows are selected instead of hydrating Issue/Customer objects
+            now = datetime.utcnow()
+            unattended_cutoff = now - timedelta(hours=24)
+            result = await self.db.execute(lambda_stmt(
+                lambda: select(
+                    Issue.id, Issue.title, Issue.severity, Issue.status,
+                    Issue.created_at, Issue.customer_id,
+                    Customer.name.label("customer_name"), Customer.vip_status
+                )
+                .join(Customer, Customer.id == Issue.customer_id)
+                .where(
+                    Issue.is_open == True,
                     or_(
                         Issue.severity == "HIGH",
-                        and_(
-                            Issue.status.in_(["OPEN", "IN_PROGRESS"]),
-                            Issue.created_at <= datetime.utcnow() - timedelta(hours=24)
-                        )
-                    ),
-                    Issue.status.in_(["OPEN", "IN_PROGRESS"])
+                        Issue.created_at <= unattended_cutoff,
+                        Customer.vip_status.is_(True)
+                    )
                 )
-            ).all()
+                .order_by(Customer.vip_status.desc(), Issue.created_at)
+                .limit(CRITICAL_ISSUES_LIMIT)
+            ))
             
             critical_issue_list = []
-            for issue in critical_issues:
-                # Get customer info
-                customer = self.db.query(Customer).filter(Customer.id == issue.customer_id).first()
-                
+            for issue in result.all():
                 critical_issue_list.append({
                     "issue_id": issue.id,
                     "title": issue.title,
@@ -272,13 +391,13 @@ class IssueService:
                     "status": issue.status,
                     "created_at": issue.created_at.isoformat(),
                     "customer_id": issue.customer_id,
-                    "customer_name": customer.name if customer else "Unknown",
-                    "vip_status": customer.vip_status if customer else False,
-                    "time_since_creation": (datetime.utcnow() - issue.created_at).total_seconds() / 3600
+                    "customer_name": issue.customer_name,
+                    "vip_status": bool(issue.vip_status),
+                    "time_since_creation": (now - issue.created_at).total_seconds() / 3600
                 })
             
-            # Sort by priority (VIP customers first, then by creation time)
-            critical_issue_list.sort(key=lambda x: (not x["vip_status"], x["time_since_creation"]), reverse=True)
+            if await cache_set_json(CRITICAL_ISSUES_CACHE_KEY, critical_issue_list, ttl=CRITICAL_ISSUES_CACHE_TTL):
+                await cache_tag_key("critical_issues", CRITICAL_ISSUES_CACHE_KEY, ttl=CRITICAL_ISSUES_CACHE_TTL)
             
             return critical_issue_list
             
@@ -298,26 +417,34 @@ class IssueService:
             Success status
         """
         try:
-            issue = self.db.query(Issue).filter(Issue.id == issue_id).first()
+            result = await self.db.execute(lambda_stmt(
+                lambda: select(Issue.customer_id, Issue.status).where(Issue.id == issue_id).with_for_update()
+            ))
+            issue = result.first()
             if not issue:
                 return False
             
             old_status = issue.status
-            issue.status = new_status
-            issue.updated_at = datetime.utcnow()
             
-            # Calculate resolution time if resolving
-            if new_status in ["RESOLVED", "CLOSED"] and old_status not in ["RESOLVED", "CLOSED"]:
-                issue.resolved_at = datetime.utcnow()
-                if issue.created_at:
-                    resolution_time = (issue.resolved_at - issue.created_at).total_seconds() / 3600
-                    issue.resolution_time = resolution_time
+            # Timestamps come from the server clock (sessions are pinned to UTC)
+            values = {"status": new_status, "updated_at": func.now()}
+            if new_status in RESOLVED_STATUSES and old_status not in RESOLVED_STATUSES:
+                values["resolved_at"] = func.now()
+                values["resolution_time"] = (
+                    func.timestampdiff(text("SECOND"), Issue.created_at, func.now()) / 3600
+                )
             
-            self.db.commit()
+            await self.db.execute(update(Issue).where(Issue.id == issue_id).values(**values))
+            await refresh_customer_stats(self.db, issue.customer_id)
+            await self.db.commit()
             
-            # Clear related caches
-            cache_delete(f"customer_history:{issue.customer_id}")
-            cache_delete(f"issue_analysis:{issue_id}")
+            # Clear related caches; the tag invalidations share one pipeline
+            await asyncio.gather(
+                cache_delete(f"customer_history:{issue.customer_id}"),
+                invalidate_cached_responses(f"customer_history:{issue.customer_id}", "critical_issues")
+            )
+            if (new_status in RESOLVED_STATUSES) != (old_status in RESOLVED_STATUSES):
+                await bump_resolved_index_version()
             
             # Log the status change
             logger.info(f"Issue {issue_id} status changed from {old_status} to {new_status}")
@@ -326,9 +453,107 @@ class IssueService:
             
         except Exception as e:
             logger.error(f"Error updating issue status: {str(e)}")
-            self.db.rollback()
+            await self.db.rollback()
             return False
     
+    async def update_issue_statuses(self, updates: List[Tuple[int, str]]) -> List[bool]:
+        """
+        Update the status of several issues in one transaction.
+        
+        The issues are locked with one SELECT ... FOR UPDATE and changed with
+        one UPDATE; stats are refreshed once per affected customer and the
+        caches are invalidated once for the whole batch. When an issue
+        appears more than once, its last status wins.
+        
+        Args:
+            updates: (issue ID, new status) pairs
+            
+        Returns:
+            Per-update success flags, in input order; an update superseded
+            by a later one for the same issue is reported as not applied
+        """
+        if not updates:
+            return []
+        new_statuses = dict(updates)
+        try:
+            result = await self.db.execute(
+                select(Issue.id, Issue.customer_id, Issue.status)
+                .where(Issue.id.in_(new_statuses))
+                .order_by(Issue.id)
+                .with_for_update()
+            )
+            issues = {row.id: row for row in result}
+            if not issues:
+                return [False] * len(updates)
+            
+            entering_resolved = [
+                issue_id for issue_id, issue in issues.items()
+                if new_statuses[issue_id] in RESOLVED_STATUSES and issue.status not in RESOLVED_STATUSES
+            ]
+            resolved_set_changed = any(
+                (new_statuses[issue_id] in RESOLVED_STATUSES) != (issue.status in RESOLVED_STATUSES)
+                for issue_id, issue in issues.items()
+            )
+            
+            # Timestamps come from the server clock (sessions are pinned to UTC)
+            values = {
+                "status": case({issue_id: new_statuses[issue_id] for issue_id in issues}, value=Issue.id),
+                "updated_at": func.now()
+            }
+            if entering_resolved:
+                entering = Issue.id.in_(entering_resolved)
+                values["resolved_at"] = case((entering, func.now()), else_=Issue.resolved_at)
+                values["resolution_time"] = case(
+                    (entering, func.timestampdiff(text("SECOND"), Issue.created_at, func.now()) / 3600),
+                    else_=Issue.resolution_time
+                )
+            
+            await self.db.execute(
+                update(Issue).where(Issue.id.in_(issues)).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            customer_ids = sorted({issue.customer_id for issue in issues.values()})
+            for customer_id in customer_ids:
+                await refresh_customer_stats(self.db, customer_id)
+            await self.db.commit()
+            
+            # Clear related caches for every affected customer at once; each
+            # history key doubles as the tag of its cached responses
+            history_keys = [f"customer_history:{customer_id}" for customer_id in customer_ids]
+            await asyncio.gather(
+                cache_delete_many(history_keys),
+                invalidate_cached_responses(*history_keys, "critical_issues")
+            )
+            if resolved_set_changed:
+                await bump_resolved_index_version()
+            
+            logger.info(f"Batch status update applied to {len(issues)} of {len(new_statuses)} issues")
+            
+            return [
+                issue_id in issues and new_statuses[issue_id] == status
+                for issue_id, status in updates
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error updating issue statuses: {str(e)}")
+            await self.db.rollback()
+            return [False] * len(updates)
+    
+    async def issue_exists(self, issue_id: int) -> bool:
+        """
+        Check whether an issue exists.
+        
+        Args:
+            issue_id: Issue ID
+            
+        Returns:
+            True if the issue exists, False otherwise
+        """
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(Issue.id).where(Issue.id == issue_id)
+        ))
+        return result.first() is not None
+    
     async def process_async_analysis(self, issue_id: int, analysis: IssueAnalysis):
         """
         Process additional analysis asynchronously.
@@ -347,7 +572,7 @@ class IssueService:
         except Exception as e:
             logger.error(f"Error in async analysis: {str(e)}")
     
-    def get_issue_statistics(self) -> Dict[str, Any]:
+    async def get_issue_statistics(self) -> Dict[str, Any]:
         """
         Get system-wide issue statistics.
         
@@ -355,31 +580,33 @@ class IssueService:
             Issue statistics
         """
         try:
-            # Get total issues
-            total_issues = self.db.query(Issue).count()
-            
-            # Get issues by status
-            open_issues = self.db.query(Issue).filter(Issue.status == "OPEN").count()
-            in_progress_issues = self.db.query(Issue).filter(Issue.status == "IN_PROGRESS").count()
-            resolved_issues = self.db.query(Issue).filter(Issue.status == "RESOLVED").count()
-            closed_issues = self.db.query(Issue).filter(Issue.status == "CLOSED").count()
-            
-            # Get issues by severity
-            high_severity = self.db.query(Issue).filter(Issue.severity == "HIGH").count()
-            normal_severity = self.db.query(Issue).filter(Issue.severity == "NORMAL").count()
-            low_severity = self.db.query(Issue).filter(Issue.severity == "LOW").count()
-            
-            # Get average resolution time
-            resolved_with_time = self.db.query(Issue).filter(
-                and_(
-                    Issue.status.in_(["RESOLVED", "CLOSED"]),
-                    Issue.resolution_time.isnot(None)
-                )
-            ).all()
-            
-            avg_resolution_time = 0
-            if resolved_with_time:
-                avg_resolution_time = sum(i.resolution_time for i in resolved_with_time) / len(resolved_with_time)
+            # Every counter and the mean resolution time in one aggregate pass
+            resolved_states = Issue.status.in_(RESOLVED_STATUSES)
+            result = await self.db.execute(
+                select(
+                    func.count().label("total"),
+                    func.count(case((Issue.status == "OPEN", 1))).label("open"),
+                    func.count(case((Issue.status == "IN_PROGRESS", 1))).label("in_progress"),
+                    func.count(case((Issue.status == "RESOLVED", 1))).label("resolved"),
+                    func.count(case((Issue.status == "CLOSED", 1))).label("closed"),
+                    func.count(case((Issue.severity == "HIGH", 1))).label("high"),
+                    func.count(case((Issue.severity == "NORMAL", 1))).label("normal"),
+                    func.count(case((Issue.severity == "LOW", 1))).label("low"),
+                    # AVG skips NULLs, so unresolved rows and missing times drop out
+                    func.avg(case((resolved_states, Issue.resolution_time))).label("avg_resolution_time")
+                ).select_from(Issue)
+            )
+            stats = result.one()
+            
+            total_issues = stats.total
+            open_issues = stats.open
+            in_progress_issues = stats.in_progress
+            resolved_issues = stats.resolved
+            closed_issues = stats.closed
+            high_severity = stats.high
+            normal_severity = stats.normal
+            low_severity = stats.low
+            avg_resolution_time = float(stats.avg_resolution_time or 0)
             
             return {
                 "total_issues": total_issues,
@@ -398,55 +625,79 @@ class IssueService:
             logger.error(f"Error getting issue statistics: {str(e)}")
             return {}
     
-    def search_issues(self, filters: Dict[str, Any], page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    async def search_issues(self, filters: Dict[str, Any], page_size: int = 20,
+                            cursor: Optional[Tuple[datetime, int]] = None) -> Dict[str, Any]:
         """
-        Search issues with filters and pagination.
+        Search issues with filters and keyset pagination, newest first.
         
         Args:
             filters: Search filters
-            page: Page number
             page_size: Items per page
+            cursor: (created_at, id) of the last issue on the previous page,
+                as returned in next_cursor; None for the first page
             
         Returns:
-            Search results with pagination
+            Search results with the cursor for the next page. total_count is
+            only computed for the first page and is None afterwards.
         """
         try:
-            query = self.db.query(Issue)
+            query = select(Issue)
             
             # Apply filters
             if filters.get("customer_id"):
-                query = query.filter(Issue.customer_id == filters["customer_id"])
+                query = query.where(Issue.customer_id == filters["customer_id"])
             
             if filters.get("severity"):
-                query = query.filter(Issue.severity == filters["severity"])
+                query = query.where(Issue.severity == filters["severity"])
             
             if filters.get("status"):
-                query = query.filter(Issue.status == filters["status"])
+                query = query.where(Issue.status == filters["status"])
             
             if filters.get("category"):
-                query = query.filter(Issue.category == filters["category"])
+                query = query.where(Issue.category == filters["category"])
             
             if filters.get("date_from"):
-                query = query.filter(Issue.created_at >= filters["date_from"])
+                query = query.where(Issue.created_at >= filters["date_from"])
             
             if filters.get("date_to"):
-                query = query.filter(Issue.created_at <= filters["date_to"])
+                query = query.where(Issue.created_at <= filters["date_to"])
+            
+            if cursor is None:
+                # Total count rides along on the page rows; COUNT() OVER () is
+                # evaluated before LIMIT, so it covers every matching row
+                query = query.add_columns(func.count().over().label("total_count"))
+            else:
+                # Seek past the previous page instead of OFFSET scanning it
+                last_created_at, last_id = cursor
+                query = query.where(or_(
+                    Issue.created_at < last_created_at,
+                    and_(Issue.created_at == last_created_at, Issue.id < last_id)
+                ))
+            
+            # One extra row tells whether another page follows
+            result = await self.db.execute(
+                query.order_by(Issue.created_at.desc(), Issue.id.desc()).limit(page_size + 1)
+            )
+            rows = result.all()
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            issues = [row[0] for row in rows]
             
-            # Get total count
-            total_count = query.count()
+            total_count = None
+            if cursor is None:
+                total_count = rows[0].total_count if rows else 0
             
-            # Apply pagination
-            offset = (page - 1) * page_size
-            issues = query.offset(offset).limit(page_size).all()
+            next_cursor = None
+            if has_more:
+                next_cursor = (issues[-1].created_at, issues[-1].id)
             
             return {
                 "issues": issues,
                 "total_count": total_count,
-                "page": page,
                 "page_size": page_size,
-                "total_pages": (total_count + page_size - 1) // page_size
+                "next_cursor": next_cursor
             }
             
         except Exception as e:
             logger.error(f"Error searching issues: {str(e)}")
-            return {"issues": [], "total_count": 0, "page": page, "page_size": page_size, "total_pages": 0} 
\ No newline at end of file
+            return {"issues": [], "total_count": 0, "page_size": page_size, "next_cursor": None}
@@ -1,17 +1,59 @@
+import asyncio
 import logging
 import json
+import re
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, desc, func, insert, select, update
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.core.database import Issue, Customer, Conversation, Recommendation
 from app.models.schemas import RecommendationRequest, RecommendationResponse
-from app.services.ai_service import AIService
-from app.core.cache import cache_set, cache_get, cache_delete
+from app.services.ai_service import AIService, get_ai_service
+from app.core.config import settings
+from app.core.cache import (
+    cache_get_json, cache_set_json, cache_tag_key, generate_issue_cache_tag,
+    generate_recommendation_response_cache_key, generate_similar_issues_cache_key
+)
 
 logger = logging.getLogger(__name__)
 
+# Follow-up tone cues; case-insensitive substring matches ("thanks" counts),
+# scanned without lowercasing a copy of the conversation
+POSITIVE_TONE_RE = re.compile("thank|great|excellent", re.IGNORECASE)
+NEGATIVE_TONE_RE = re.compile("frustrated|angry|disappointed", re.IGNORECASE)
+
+# Greeting phrases rewritten for VIP customers and urgent issues; one
+# alternation lets a single scan apply whichever rewrites are active
+VIP_GREETING_SUBSTITUTIONS = {
+    "Thank you for reaching out": "Thank you for reaching out to our VIP support team"
+}
+URGENT_GREETING_SUBSTITUTIONS = {
+    "I'm here to help": "I understand this is urgent and I'm here to help immediately"
+}
+GREETING_PHRASE_RE = re.compile(
+    "|".join(re.escape(phrase) for phrase in (*VIP_GREETING_SUBSTITUTIONS, *URGENT_GREETING_SUBSTITUTIONS))
+)
+
+# Characters of conversation history included in the solution prompt
+SOLUTION_CONTEXT_CHARS = 500
+
+def _collect_conversation_text(conversations: List[Conversation], limit: int) -> str:
+    """Join messages in order, stopping once limit characters are collected"""
+    parts = []
+    size = 0
+    for conv in conversations:
+        parts.append(conv.message)
+        size += len(conv.message) + 1
+        if size >= limit:
+            break
+    return " ".join(parts)[:limit]
+
+# Usage analytics tolerate a minute of staleness
+RECOMMENDATION_ANALYTICS_CACHE_KEY = "recommendation_analytics"
+RECOMMENDATION_ANALYTICS_CACHE_TTL = 60
+
 class RecommendationService:
     """
     Recommendation Service for generating message templates and recommendations.
@@ -23,48 +65,60 @@ class RecommendationService:
     - Performance optimization
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, ai_service: Optional[AIService] = None):
         self.db = db
-        self.ai_service = AIService()
+        self.ai_service = ai_service or get_ai_service()
     
-    async def generate_recommendations(self, issue_id: int, context: str, ai_service: AIService) -> RecommendationResponse:
+    async def generate_recommendations(self, issue_id: int, context: str) -> RecommendationResponse:
         """
         Generate comprehensive recommendations for support executives.
         
         Args:
             issue_id: Issue ID
             context: Current conversation context
-            ai_service: AI service instance
             
         Returns:
             Recommendation response with templates and reasoning
         """
         try:
-            # Get issue details
-            issue = self.db.query(Issue).filter(Issue.id == issue_id).first()
+            ai_service = self.ai_service
+            # The similar-issues cache is keyed by issue ID alone, so its
+            # Redis read overlaps the issue load instead of following it
+            issue, cached_similar = await asyncio.gather(
+                self._load_issue(issue_id),
+                cache_get_json(generate_similar_issues_cache_key(issue_id))
+            )
             if not issue:
                 raise ValueError(f"Issue {issue_id} not found")
-            
-            # Get customer information
-            customer = self.db.query(Customer).filter(Customer.id == issue.customer_id).first()
-            
-            # Get conversation history
-            conversations = self.db.query(Conversation).filter(
-                Conversation.issue_id == issue_id
-            ).order_by(Conversation.created_at).all()
-            
-            # Generate different types of recommendations
-            greeting_recommendations = await self._generate_greeting_recommendations(
-                issue, customer, context, ai_service
-            )
-            
-            solution_recommendations = await self._generate_solution_recommendations(
-                issue, customer, conversations, ai_service
-            )
-            
-            follow_up_recommendations = await self._generate_follow_up_recommendations(
-                issue, customer, conversations, ai_service
+            customer = issue.customer
+            conversations = issue.conversations  # ordered by created_at
+            
+            # Identical context against an unchanged issue and conversation
+            # reuses the previous response and skips the completions
+            issue_version = (
+                f"{issue.updated_at.timestamp() if issue.updated_at else 0}:"
+                f"{len(conversations)}:{conversations[-1].id if conversations else 0}"
             )
+            cache_key = generate_recommendation_response_cache_key(issue_id, context, issue_version)
+            cached_response = await cache_get_json(cache_key)
+            if cached_response is not None:
+                return RecommendationResponse.model_validate(cached_response)
+            
+            if cached_similar is not None:
+                similar_issues = cached_similar["items"]
+            else:
+                similar_issues = await self._find_similar_issues(issue, ai_service)
+            
+            # All three recommendation types come back from one batched
+            # completion instead of three separate round trips
+            batched = await ai_service.generate_recommendations_batch(issue.id, [
+                self._greeting_request(issue, customer, context),
+                self._solution_request(issue, conversations, similar_issues),
+                self._follow_up_request(issue, conversations)
+            ])
+            greeting_recommendations = self._generate_greeting_recommendations(issue, customer, batched[0])
+            solution_recommendations = self._generate_solution_recommendations(issue, similar_issues, batched[1])
+            follow_up_recommendations = self._generate_follow_up_recommendations(issue, batched[2])
             
             # Combine all recommendations
             all_recommendations = []
@@ -86,43 +140,126 @@ class RecommendationService:
             # Store recommendations in database
             await self._store_recommendations(issue_id, all_recommendations)
             
-            return RecommendationResponse(
+            response = RecommendationResponse(
                 issue_id=issue_id,
                 recommendations=all_recommendations,
                 confidence_scores=confidence_scores,
                 reasoning=reasoning
             )
+            await cache_set_json(cache_key, response.model_dump(), ttl=settings.CACHE_TTL)
+            await cache_tag_key(generate_issue_cache_tag(issue_id), cache_key, ttl=settings.CACHE_TTL)
+            
+            return response
             
         except Exception as e:
             logger.error(f"Error generating recommendations: {str(e)}")
             raise
     
-    async def _generate_greeting_recommendations(self, issue: Issue, customer: Customer, 
-                                               context: str, ai_service: AIService) -> List[Dict[str, Any]]:
-        """Generate greeting message recommendations"""
+    async def prefetch_recommendations(self, issue_id: int):
+        """
+        Warm the caches behind generate_recommendations for an issue.
+        
+        Run when an agent picks up an issue, since asking for recommendations
+        is nearly always the next step. The greeting prompt depends on the
+        agent's context and is left to the real request; similar issues and
+        the solution and follow-up completions are fetched and cached now.
+        
+        Args:
+            issue_id: Issue ID
+        """
         try:
-            # Prepare context for greeting
-            greeting_context = f"Issue: {issue.title}. Customer: {customer.name}. {context}"
+            issue = await self._load_issue(issue_id)
+            if not issue:
+                return
+            conversations = issue.conversations
+            similar_issues = await self._get_similar_issues(issue, self.ai_service)
+            await self.ai_service.generate_recommendations_batch(issue.id, [
+                self._solution_request(issue, conversations, similar_issues),
+                self._follow_up_request(issue, conversations)
+            ])
+        except Exception as e:
+            logger.error(f"Error prefetching recommendations: {str(e)}")
+    
+    async def _load_issue(self, issue_id: int) -> Optional[Issue]:
+        """
+        Load an issue with its customer and conversation messages.
+        
+        Args:
+            issue_id: Issue ID
             
-            recommendations = await ai_service.generate_recommendations(
-                issue.id, greeting_context, "greeting", "professional"
+        Returns:
+            Issue, or None if it does not exist
+        """
+        # Issue, customer and conversation history in one round trip for
+        # the joined issue/customer row plus one IN query for messages
+        result = await self.db.execute(
+            select(Issue)
+            .options(
+                joinedload(Issue.customer),
+                selectinload(Issue.conversations).load_only(Conversation.id, Conversation.message)
             )
+            .where(Issue.id == issue_id)
+        )
+        return result.scalars().first()
+    
+    async def _get_similar_issues(self, issue: Issue, ai_service: AIService) -> List[Dict[str, Any]]:
+        """
+        Get the resolved issues most similar to an issue, cached per issue.
+        
+        Args:
+            issue: Issue being answered
+            ai_service: AI service instance
+            
+        Returns:
+            Similar issues
+        """
+        cached_similar = await cache_get_json(generate_similar_issues_cache_key(issue.id))
+        if cached_similar is not None:
+            return cached_similar["items"]
+        return await self._find_similar_issues(issue, ai_service)
+    
+    async def _find_similar_issues(self, issue: Issue, ai_service: AIService) -> List[Dict[str, Any]]:
+        """
+        Search for the resolved issues most similar to an issue and cache them.
+        
+        Args:
+            issue: Issue being answered
+            ai_service: AI service instance
+            
+        Returns:
+            Similar issues
+        """
+        similar_issues = await ai_service.find_similar_issues(
+            f"{issue.title} {issue.description}", self.db
+        )
+        cache_key = generate_similar_issues_cache_key(issue.id)
+        await cache_set_json(cache_key, {"items": similar_issues}, ttl=settings.CACHE_TTL)
+        await cache_tag_key(generate_issue_cache_tag(issue.id), cache_key, ttl=settings.CACHE_TTL)
+        return similar_issues
+    
+    def _greeting_request(self, issue: Issue, customer: Customer, context: str) -> Tuple[str, str, str]:
+        """Build the (context, message_type, tone) prompt for greeting recommendations"""
+        greeting_context = f"Issue: {issue.title}. Customer: {customer.name}. {context}"
+        return greeting_context, "greeting", "professional"
+    
+    def _generate_greeting_recommendations(self, issue: Issue, customer: Customer,
+                                           recommendations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Customize generated greeting recommendations"""
+        try:
+            # Customer- and issue-specific phrasing, applied in one pass
+            substitutions = {}
+            if customer.vip_status:
+                substitutions.update(VIP_GREETING_SUBSTITUTIONS)
+            if issue.severity == "HIGH":
+                substitutions.update(URGENT_GREETING_SUBSTITUTIONS)
             
-            # Add customer-specific customization
             for rec in recommendations:
-                if customer.vip_status:
-                    rec["template"] = rec["template"].replace(
-                        "Thank you for reaching out",
-                        "Thank you for reaching out to our VIP support team"
+                if substitutions:
+                    rec["template"] = GREETING_PHRASE_RE.sub(
+                        lambda m: substitutions.get(m.group(0), m.group(0)), rec["template"]
                     )
+                if customer.vip_status:
                     rec["confidence_score"] = min(0.95, rec["confidence_score"] + 0.1)
-                
-                # Add issue-specific context
-                if issue.severity == "HIGH":
-                    rec["template"] = rec["template"].replace(
-                        "I'm here to help",
-                        "I understand this is urgent and I'm here to help immediately"
-                    )
             
             return recommendations[:2]  # Return top 2 greeting recommendations
             
@@ -130,30 +267,25 @@ class RecommendationService:
             logger.error(f"Error generating greeting recommendations: {str(e)}")
             return self._get_fallback_greeting_recommendations(issue, customer)
     
-    async def _generate_solution_recommendations(self, issue: Issue, customer: Customer,
-                                               conversations: List[Conversation], 
-                                               ai_service: AIService) -> List[Dict[str, Any]]:
-        """Generate solution message recommendations"""
+    def _solution_request(self, issue: Issue, conversations: List[Conversation],
+                          similar_issues: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+        """Build the (context, message_type, tone) prompt for solution recommendations"""
+        # Analyze conversation context
+        conversation_text = _collect_conversation_text(conversations, SOLUTION_CONTEXT_CHARS)
+        
+        # Prepare solution context
+        solution_context = f"Issue: {issue.title}. Description: {issue.description}. "
+        solution_context += f"Conversation: {conversation_text}. "
+        
+        if similar_issues:
+            solution_context += f"Similar resolved issues found: {len(similar_issues)}"
+        
+        return solution_context, "solution", "helpful"
+    
+    def _generate_solution_recommendations(self, issue: Issue, similar_issues: List[Dict[str, Any]],
+                                           recommendations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Enhance generated solution recommendations"""
         try:
-            # Analyze conversation context
-            conversation_text = " ".join([conv.message for conv in conversations])
-            
-            # Get similar issues for solution patterns
-            similar_issues = await ai_service.find_similar_issues(
-                f"{issue.title} {issue.description}", self.db
-            )
-            
-            # Prepare solution context
-            solution_context = f"Issue: {issue.title}. Description: {issue.description}. "
-            solution_context += f"Conversation: {conversation_text[:500]}. "
-            
-            if similar_issues:
-                solution_context += f"Similar resolved issues found: {len(similar_issues)}"
-            
-            recommendations = await ai_service.generate_recommendations(
-                issue.id, solution_context, "solution", "helpful"
-            )
-            
             # Enhance with similar issue solutions
             if similar_issues:
                 for rec in recommendations:
@@ -170,29 +302,26 @@ class RecommendationService:
             logger.error(f"Error generating solution recommendations: {str(e)}")
             return self._get_fallback_solution_recommendations(issue)
     
-    async def _generate_follow_up_recommendations(self, issue: Issue, customer: Customer,
-                                                conversations: List[Conversation], 
-                                                ai_service: AIService) -> List[Dict[str, Any]]:
-        """Generate follow-up message recommendations"""
+    def _follow_up_request(self, issue: Issue, conversations: List[Conversation]) -> Tuple[str, str, str]:
+        """Build the (context, message_type, tone) prompt for follow-up recommendations"""
+        # Determine follow-up tone based on conversation, message by
+        # message so the history is never joined into one string
+        tone = "professional"
+        if any(POSITIVE_TONE_RE.search(conv.message) for conv in conversations):
+            tone = "positive"
+        elif any(NEGATIVE_TONE_RE.search(conv.message) for conv in conversations):
+            tone = "empathetic"
+        
+        # Prepare follow-up context
+        follow_up_context = f"Issue: {issue.title}. Conversation length: {len(conversations)} messages. "
+        follow_up_context += f"Current status: {issue.status}. Tone: {tone}"
+        
+        return follow_up_context, "follow-up", tone
+    
+    def _generate_follow_up_recommendations(self, issue: Issue,
+                                            recommendations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Customize generated follow-up recommendations"""
         try:
-            # Analyze conversation sentiment
-            conversation_text = " ".join([conv.message for conv in conversations])
-            
-            # Determine follow-up tone based on conversation
-            tone = "professional"
-            if any(word in conversation_text.lower() for word in ["thank", "great", "excellent"]):
-                tone = "positive"
-            elif any(word in conversation_text.lower() for word in ["frustrated", "angry", "disappointed"]):
-                tone = "empathetic"
-            
-            # Prepare follow-up context
-            follow_up_context = f"Issue: {issue.title}. Conversation length: {len(conversations)} messages. "
-            follow_up_context += f"Current status: {issue.status}. Tone: {tone}"
-            
-            recommendations = await ai_service.generate_recommendations(
-                issue.id, follow_up_context, "follow-up", tone
-            )
-            
             # Customize based on issue status
             for rec in recommendations:
                 if issue.status == "RESOLVED":
@@ -216,7 +345,7 @@ class RecommendationService:
         if customer.vip_status:
             reasoning_parts.append("VIP customer - enhanced service level")
         
-        if customer.total_issues > 10:
+        if (customer.total_issues or 0) > 10:
             reasoning_parts.append("Experienced customer - familiar with process")
         
         # Issue-based reasoning
@@ -227,7 +356,7 @@ class RecommendationService:
             reasoning_parts.append("Extended conversation - detailed context available")
         
         # Recommendation-based reasoning
-        high_confidence_count = len([r for r in recommendations if r["confidence_score"] > 0.8])
+        high_confidence_count = sum(1 for r in recommendations if r["confidence_score"] > 0.8)
         if high_confidence_count > 2:
             reasoning_parts.append("High confidence recommendations based on similar cases")
         
@@ -238,24 +367,28 @@ class RecommendationService:
     
     async def _store_recommendations(self, issue_id: int, recommendations: List[Dict[str, Any]]):
         """Store recommendations in database for tracking"""
+        if not recommendations:
+            return
         try:
-            for rec in recommendations:
-                db_recommendation = Recommendation(
-                    issue_id=issue_id,
-                    template_text=rec["template"],
-                    message_type=rec.get("type", "general"),
-                    tone=rec.get("tone", "professional"),
-                    confidence_score=rec["confidence_score"],
-                    reasoning=rec.get("reasoning", ""),
-                    created_at=datetime.utcnow()
-                )
-                self.db.add(db_recommendation)
-            
-            self.db.commit()
+            # One multi-row INSERT instead of tracking an ORM object per row
+            now = datetime.utcnow()
+            await self.db.execute(insert(Recommendation), [
+                {
+                    "issue_id": issue_id,
+                    "template_text": rec["template"],
+                    "message_type": rec.get("type", "general"),
+                    "tone": rec.get("tone", "professional"),
+                    "confidence_score": rec["confidence_score"],
+                    "reasoning": rec.get("reasoning", ""),
+                    "created_at": now
+                }
+                for rec in recommendations
+            ])
+            await self.db.commit()
             
         except Exception as e:
             logger.error(f"Error storing recommendations: {str(e)}")
-            self.db.rollback()
+            await self.db.rollback()
     
     def _get_fallback_greeting_recommendations(self, issue: Issue, customer: Customer) -> List[Dict[str, Any]]:
         """Get fallback greeting recommendations"""
@@ -299,9 +432,20 @@ class RecommendationService:
             List of historical recommendations
         """
         try:
-            recommendations = self.db.query(Recommendation).filter(
-                Recommendation.issue_id == issue_id
-            ).order_by(desc(Recommendation.created_at)).all()
+            # Plain column rows; no ORM instances or identity map entries
+            result = await self.db.execute(
+                select(
+                    Recommendation.id,
+                    Recommendation.template_text,
+                    Recommendation.message_type,
+                    Recommendation.tone,
+                    Recommendation.confidence_score,
+                    Recommendation.used_count,
+                    Recommendation.created_at
+                ).where(
+                    Recommendation.issue_id == issue_id
+                ).order_by(desc(Recommendation.created_at))
+            )
             
             return [
                 {
@@ -309,11 +453,11 @@ class RecommendationService:
                     "template": rec.template_text,
                     "type": rec.message_type,
                     "tone": rec.tone,
-                    "confidence_score": float(rec.confidence_score),
+                    "confidence_score": rec.confidence_score,
                     "used_count": rec.used_count,
                     "created_at": rec.created_at.isoformat()
                 }
-                for rec in recommendations
+                for rec in result
             ]
             
         except Exception as e:
@@ -328,17 +472,18 @@ class RecommendationService:
             recommendation_id: Recommendation ID
         """
         try:
-            recommendation = self.db.query(Recommendation).filter(
-                Recommendation.id == recommendation_id
-            ).first()
-            
-            if recommendation:
-                recommendation.used_count += 1
-                self.db.commit()
+            # Atomic increment in one statement; concurrent agents cannot
+            # overwrite each other's counts as a read-modify-write would
+            await self.db.execute(
+                update(Recommendation)
+                .where(Recommendation.id == recommendation_id)
+                .values(used_count=Recommendation.used_count + 1)
+            )
+            await self.db.commit()
                 
         except Exception as e:
             logger.error(f"Error marking recommendation as used: {str(e)}")
-            self.db.rollback()
+            await self.db.rollback()
     
     async def get_popular_recommendations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -351,9 +496,18 @@ class RecommendationService:
             List of popular recommendations
         """
         try:
-            popular_recommendations = self.db.query(Recommendation).filter(
-                Recommendation.used_count > 0
-            ).order_by(desc(Recommendation.used_count)).limit(limit).all()
+            result = await self.db.execute(
+                select(
+                    Recommendation.id,
+                    Recommendation.template_text,
+                    Recommendation.message_type,
+                    Recommendation.tone,
+                    Recommendation.used_count,
+                    Recommendation.confidence_score
+                ).where(
+                    Recommendation.used_count > 0
+                ).order_by(desc(Recommendation.used_count)).limit(limit)
+            )
             
             return [
                 {
@@ -362,9 +516,9 @@ class RecommendationService:
                     "type": rec.message_type,
                     "tone": rec.tone,
                     "used_count": rec.used_count,
-                    "confidence_score": float(rec.confidence_score)
+                    "confidence_score": rec.confidence_score
                 }
-                for rec in popular_recommendations
+                for rec in result
             ]
             
         except Exception as e:
@@ -379,38 +533,44 @@ class RecommendationService:
             Recommendation analytics
         """
         try:
-            total_recommendations = self.db.query(Recommendation).count()
-            used_recommendations = self.db.query(Recommendation).filter(
-                Recommendation.used_count > 0
-            ).count()
-            
-            # Get average confidence score
-            avg_confidence = self.db.query(func.avg(Recommendation.confidence_score)).scalar()
-            
-            # Get recommendations by type
-            greeting_count = self.db.query(Recommendation).filter(
-                Recommendation.message_type == "greeting"
-            ).count()
-            
-            solution_count = self.db.query(Recommendation).filter(
-                Recommendation.message_type == "solution"
-            ).count()
+            cached_analytics = await cache_get_json(RECOMMENDATION_ANALYTICS_CACHE_KEY)
+            if cached_analytics is not None:
+                return cached_analytics
+            
+            # Totals, usage, mean confidence and per-type counts in one pass
+            result = await self.db.execute(
+                select(
+                    func.count().label("total"),
+                    func.count(case((Recommendation.used_count > 0, 1))).label("used"),
+                    func.avg(Recommendation.confidence_score).label("avg_confidence"),
+                    func.count(case((Recommendation.message_type == "greeting", 1))).label("greeting"),
+                    func.count(case((Recommendation.message_type == "solution", 1))).label("solution"),
+                    func.count(case((Recommendation.message_type == "follow-up", 1))).label("follow_up")
+                ).select_from(Recommendation)
+            )
+            stats = result.one()
             
-            follow_up_count = self.db.query(Recommendation).filter(
-                Recommendation.message_type == "follow-up"
-            ).count()
+            total_recommendations = stats.total
+            used_recommendations = stats.used
+            avg_confidence = stats.avg_confidence
+            greeting_count = stats.greeting
+            solution_count = stats.solution
+            follow_up_count = stats.follow_up
             
-            return {
+            analytics = {
                 "total_recommendations": total_recommendations,
                 "used_recommendations": used_recommendations,
                 "usage_rate": round(used_recommendations / total_recommendations * 100, 2) if total_recommendations > 0 else 0,
-                "avg_confidence_score": round(float(avg_confidence), 2) if avg_confidence else 0,
+                "avg_confidence_score": round(avg_confidence, 2) if avg_confidence else 0,
                 "by_type": {
                     "greeting": greeting_count,
                     "solution": solution_count,
                     "follow_up": follow_up_count
                 }
             }
+            await cache_set_json(RECOMMENDATION_ANALYTICS_CACHE_KEY, analytics, ttl=RECOMMENDATION_ANALYTICS_CACHE_TTL)
+            
+            return analytics
             
         except Exception as e:
             logger.error(f"Error getting recommendation analytics: {str(e)}")
@@ -3,12 +3,45 @@ Support Copilot API Examples
 
 This file contains example code snippets demonstrating how to use the Support Copilot API
 for various use cases including issue analysis, recommendation generation, and conversation management.
+
+Requires requests, httpx and msgspec (all listed in requirements.txt); orjson and h2
+are used when installed.
 """
 
+import asyncio
+import hashlib
+import importlib.util
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import msgspec
+import random
+import sqlite3
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import time
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+
+# orjson encodes and decodes several times faster than the stdlib; it stays
+# optional so the examples run with only requests, httpx and msgspec installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda value: json.dumps(value).encode()
+
+def _decode(content: bytes, response_type: Optional[type] = None) -> Any:
+    """Decode a response body, into response_type when one is given"""
+    if response_type is None:
+        return _json_loads(content)
+    return msgspec.json.decode(content, type=response_type)
 
 # API Configuration
 BASE_URL = "http://localhost:8000"
@@ -18,18 +51,290 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
+# HTTP/2 lets the async client multiplex concurrent requests over a single
+# TLS connection; httpx needs the optional h2 package for it and otherwise
+# stays on HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Read-only GETs (customer history, critical issues, metrics) tolerate a few
+# seconds of staleness, so clients answer repeats from memory
+GET_CACHE_TTL = 30  # seconds
+GET_CACHE_MAXSIZE = 512
+
+# Once the TTL lapses, a GET revalidates with the last ETag; an unchanged
+# body comes back as an empty 304 and the kept payload is reused
+ETAG_CACHE_TTL = 3600  # seconds
+
+# Optional on-disk tier under the sync client's GET cache, so reporting runs
+# reuse responses fetched by earlier processes
+PERSISTENT_CACHE_TTL = 300  # seconds
+
+# Concurrent per-customer requests when enriching a list of issues; stays
+# below the session's pool size so every request reuses a kept-alive connection
+ENRICH_CONCURRENCY = 10
+
+# Paths whose cached responses a status update makes stale
+STATUS_UPDATE_INVALIDATES = ("/api/v1/issues/critical", "/api/v1/metrics", "/api/v1/customers/", "/api/v1/dashboard")
+
+# Typed responses. msgspec decodes and validates in one pass into slotted
+# structs, so a renamed or missing field fails at decode time instead of as
+# a KeyError deep in calling code; unknown fields are ignored.
+class IssueAnalysis(msgspec.Struct):
+    issue_id: int
+    severity_assessment: str
+    confidence_score: float
+    customer_history: Dict[str, Any]
+    similar_issues: List[Dict[str, Any]]
+    critical_flags: List[str]
+    recommended_actions: List[str]
+    processing_time: float
+
+class RecommendationResponse(msgspec.Struct):
+    issue_id: int
+    recommendations: List[Dict[str, Any]]
+    confidence_scores: List[float]
+    reasoning: str
+
+class RecentIssue(msgspec.Struct):
+    issue_id: int
+    title: str
+    status: str
+    severity: str
+    resolution_time: Optional[float] = None
+    created_at: Optional[str] = None
+
+class CustomerHistory(msgspec.Struct):
+    customer_id: int
+    total_issues: int
+    resolved_issues: int
+    avg_resolution_time: str
+    critical_issues: int
+    recent_issues: List[RecentIssue]
+    issue_patterns: List[str]
+    customer_satisfaction: Optional[float] = None
+
+class CriticalIssue(msgspec.Struct):
+    issue_id: int
+    title: str
+    severity: str
+    status: str
+    created_at: str
+    customer_id: int
+    customer_name: str
+    vip_status: bool
+    time_since_creation: float
+
+class CriticalIssuesResponse(msgspec.Struct):
+    critical_issues: List[CriticalIssue]
+
+class Dashboard(msgspec.Struct):
+    critical_issues: List[CriticalIssue]
+    metrics: Dict[str, Any]
+    customer_history: CustomerHistory
+
+class _ClientRetry(Retry):
+    """
+    Retry policy for the sync client.
+    
+    Idempotent methods retry on 429 and transient 5xx responses. POSTs
+    retry only on 429, which the server sends before doing any work, so a
+    non-idempotent request is never applied twice. Backoff is jittered so
+    many clients do not retry in lockstep.
+    """
+    
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429 and method.upper() == "POST" and self.total:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+    
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, backoff) if backoff else 0
+
+class _TTLCache:
+    """Small thread-safe TTL cache of GET response payloads keyed by path"""
+    
+    def __init__(self, maxsize: int = GET_CACHE_MAXSIZE, ttl: float = GET_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                # Oldest insertion first
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+    
+    def invalidate(self, path_prefix: str = ""):
+        """Drop cached responses whose path starts with path_prefix"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(path_prefix)]:
+                del self._entries[key]
+
+class _SQLiteResponseCache:
+    """
+    Persistent store of raw GET response bodies keyed by client namespace and path.
+    
+    Bodies are kept undecoded together with their ETag, so an entry past
+    its expiry can still be revalidated with If-None-Match.
+    """
+    
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(path TEXT PRIMARY KEY, etag TEXT, body BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Tuple[Optional[str], bytes, bool]]:
+        """Return (etag, body, fresh) for a stored response, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, body, expires_at FROM responses WHERE path = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, body, expires_at = row
+        return etag, body, expires_at > time.time()
+    
+    def set(self, key: str, etag: Optional[str], body: bytes, ttl: float = PERSISTENT_CACHE_TTL):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (path, etag, body, expires_at) VALUES (?, ?, ?, ?)",
+                (key, etag, body, time.time() + ttl)
+            )
+    
+    def invalidate(self, path_prefix: str = ""):
+        """Drop stored responses whose path starts with path_prefix"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM responses WHERE substr(path, 1, ?) = ?", (len(path_prefix), path_prefix)
+            )
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
 class SupportCopilotClient:
     """Client for interacting with Support Copilot API"""
     
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(self, base_url: str, api_key: str, cache_path: Optional[str] = None):
         self.base_url = base_url
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        
+        # One pooled session keeps connections alive across calls instead of
+        # paying a new TCP (and TLS) handshake per request. Transient
+        # failures are retried with backoff, honouring Retry-After.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=_ClientRetry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 502, 503, 504],
+                respect_retry_after_header=True,
+                raise_on_status=False  # hand the last response to the usual status check
+            )
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cache = _TTLCache()
+        self._etag_cache = _TTLCache(ttl=ETAG_CACHE_TTL)
+        self._pending_status_updates: List[Tuple[int, str]] = []
+        
+        # Pass cache_path (an SQLite file) to keep GET responses across runs.
+        # Stored entries are namespaced by server and credential, so one file
+        # never serves a response fetched for another server or API key.
+        self._store = _SQLiteResponseCache(cache_path) if cache_path else None
+        api_key_digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        self._store_prefix = f"{base_url}|{api_key_digest}|"
+    
+    def close(self):
+        """Close the pooled connections"""
+        self.session.close()
+        if self._store:
+            self._store.close()
+    
+    def invalidate(self, path_prefix: str = ""):
+        """Drop cached GET responses whose path starts with path_prefix"""
+        self._cache.invalidate(path_prefix)
+        if self._store:
+            self._store.invalidate(self._store_prefix + path_prefix)
+    
+    @staticmethod
+    def _idempotency_headers() -> Dict[str, str]:
+        """Per-call key that stays the same across retries of one POST"""
+        return {"Idempotency-Key": str(uuid.uuid4())}
+    
+    def _cached_get(self, path: str, ttl: float = GET_CACHE_TTL, response_type: Optional[type] = None) -> Any:
+        """GET a read-only endpoint, answering repeats within ttl from memory"""
+        cached = self._cache.get(path)
+        if cached is not None:
+            return cached
+        
+        # (etag, decoded data, raw body) of the last response, kept for revalidation
+        validated = self._etag_cache.get(path)
+        store_key = self._store_prefix + path
+        if validated is None and self._store:
+            stored = self._store.get(store_key)
+            if stored:
+                etag, body, fresh = stored
+                data = _decode(body, response_type)
+                if fresh:
+                    self._cache.set(path, data, ttl)
+                    return data
+                if etag:
+                    validated = (etag, data, body)
+        
+        headers = {"If-None-Match": validated[0]} if validated else None
+        response = self.session.get(f"{self.base_url}{path}", headers=headers, timeout=15)
+        
+        if response.status_code == 304 and validated:
+            etag, data, body = validated
+            if self._store:
+                # Revalidated, so the stored body is fresh for another period
+                self._store.set(store_key, etag, body)
+        elif response.status_code == 200:
+            data = _decode(response.content, response_type)
+            etag = response.headers.get("ETag")
+            if etag:
+                self._etag_cache.set(path, (etag, data, response.content))
+            if self._store:
+                self._store.set(store_key, etag, response.content)
+        else:
+            raise Exception(f"API Error: {response.status_code} - {response.text}")
+        
+        self._cache.set(path, data, ttl)
+        return data
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
     
     def analyze_new_issue(self, customer_id: int, title: str, description: str, 
-                         category: str = None, priority: str = None) -> Dict[str, Any]:
+                         category: str = None, priority: str = None) -> IssueAnalysis:
         """
         Analyze a new support issue and get AI-powered insights.
         
@@ -42,8 +347,8 @@ class SupportCopilotClient:
         ...     category="Authentication",
         ...     priority="High"
         ... )
-        >>> print(f"Severity: {analysis['severity_assessment']}")
-        >>> print(f"Confidence: {analysis['confidence_score']}")
+        >>> print(f"Severity: {analysis.severity_assessment}")
+        >>> print(f"Confidence: {analysis.confidence_score}")
         """
         
         payload = {
@@ -54,20 +359,20 @@ class SupportCopilotClient:
             "priority": priority
         }
         
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/api/v1/issues/analyze",
-            headers=self.headers,
-            json=payload,
+            data=_json_dumps(payload),
+            headers=self._idempotency_headers(),
             timeout=15
         )
         
         if response.status_code == 200:
-            return response.json()
+            return _decode(response.content, IssueAnalysis)
         else:
             raise Exception(f"API Error: {response.status_code} - {response.text}")
     
     def get_recommendations(self, issue_id: int, context: str, 
-                           message_type: str = "greeting", tone: str = "professional") -> Dict[str, Any]:
+                           message_type: str = "greeting", tone: str = "professional") -> RecommendationResponse:
         """
         Get AI-generated message recommendations for support executives.
         
@@ -78,7 +383,7 @@ class SupportCopilotClient:
         ...     message_type="greeting",
         ...     tone="professional"
         ... )
-        >>> for rec in recommendations['recommendations']:
+        >>> for rec in recommendations.recommendations:
         ...     print(f"Template: {rec['template']}")
         ...     print(f"Confidence: {rec['confidence_score']}")
         """
@@ -89,62 +394,56 @@ class SupportCopilotClient:
             "tone": tone
         }
         
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/api/v1/issues/{issue_id}/recommend",
-            headers=self.headers,
-            json=payload,
+            data=_json_dumps(payload),
+            headers=self._idempotency_headers(),
             timeout=15
         )
         
         if response.status_code == 200:
-            return response.json()
+            return _decode(response.content, RecommendationResponse)
         else:
             raise Exception(f"API Error: {response.status_code} - {response.text}")
     
-    def get_customer_history(self, customer_id: int) -> Dict[str, Any]:
+    def get_customer_history(self, customer_id: int) -> CustomerHistory:
         """
         Get comprehensive customer history and analytics.
         
         Example:
         >>> history = client.get_customer_history(customer_id=1)
-        >>> print(f"Total Issues: {history['total_issues']}")
-        >>> print(f"Avg Resolution Time: {history['avg_resolution_time']}")
-        >>> print(f"Critical Issues: {history['critical_issues']}")
+        >>> print(f"Total Issues: {history.total_issues}")
+        >>> print(f"Avg Resolution Time: {history.avg_resolution_time}")
+        >>> print(f"Critical Issues: {history.critical_issues}")
         """
         
-        response = requests.get(
-            f"{self.base_url}/api/v1/customers/{customer_id}/history",
-            headers=self.headers,
-            timeout=15
-        )
+        return self._cached_get(f"/api/v1/customers/{customer_id}/history", response_type=CustomerHistory)
+    
+    def get_customer_histories(self, customer_ids: List[int]) -> Dict[int, CustomerHistory]:
+        """
+        Get the history of several customers, fetched concurrently.
         
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
+        Example:
+        >>> critical_issues = client.get_critical_issues()
+        >>> histories = client.get_customer_histories([i.customer_id for i in critical_issues])
+        """
+        unique_ids = list(dict.fromkeys(customer_ids))
+        with ThreadPoolExecutor(max_workers=ENRICH_CONCURRENCY) as executor:
+            return dict(zip(unique_ids, executor.map(self.get_customer_history, unique_ids)))
     
-    def get_critical_issues(self) -> List[Dict[str, Any]]:
+    def get_critical_issues(self) -> List[CriticalIssue]:
         """
         Get all critical issues that require immediate attention.
         
         Example:
         >>> critical_issues = client.get_critical_issues()
         >>> for issue in critical_issues:
-        ...     print(f"Issue {issue['issue_id']}: {issue['title']}")
-        ...     print(f"Customer: {issue['customer_name']}")
-        ...     print(f"VIP Status: {issue['vip_status']}")
+        ...     print(f"Issue {issue.issue_id}: {issue.title}")
+        ...     print(f"Customer: {issue.customer_name}")
+        ...     print(f"VIP Status: {issue.vip_status}")
         """
         
-        response = requests.get(
-            f"{self.base_url}/api/v1/issues/critical",
-            headers=self.headers,
-            timeout=15
-        )
-        
-        if response.status_code == 200:
-            return response.json()["critical_issues"]
-        else:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
+        return self._cached_get("/api/v1/issues/critical", response_type=CriticalIssuesResponse).critical_issues
     
     def update_issue_status(self, issue_id: int, new_status: str) -> bool:
         """
@@ -155,13 +454,51 @@ class SupportCopilotClient:
         >>> print(f"Status updated: {success}")
         """
         
-        response = requests.put(
-            f"{self.base_url}/api/v1/issues/{issue_id}/status?status={new_status}",
-            headers=self.headers,
-            timeout=15
+        return self.update_issue_statuses([(issue_id, new_status)])[issue_id]
+    
+    def update_issue_statuses(self, updates: List[Tuple[int, str]]) -> Dict[int, bool]:
+        """
+        Update the status of several issues in a single request.
+        
+        Example:
+        >>> results = client.update_issue_statuses([(123, "RESOLVED"), (124, "CLOSED")])
+        >>> print(f"Updated: {[i for i, ok in results.items() if ok]}")
+        """
+        
+        if not updates:
+            return {}
+        
+        response = self.session.put(
+            f"{self.base_url}/api/v1/issues/status/batch",
+            data=_json_dumps({"updates": [{"issue_id": i, "status": s} for i, s in updates]}),
+            timeout=30
         )
         
-        return response.status_code == 200
+        if response.status_code != 200:
+            return {issue_id: False for issue_id, _ in updates}
+        
+        results = {row["issue_id"]: row["ok"] for row in _json_loads(response.content)["results"]}
+        if any(results.values()):
+            for path_prefix in STATUS_UPDATE_INVALIDATES:
+                self.invalidate(path_prefix)
+        return results
+    
+    def queue_status_update(self, issue_id: int, new_status: str):
+        """Queue a status change to send with the next flush_status_updates()"""
+        self._pending_status_updates.append((issue_id, new_status))
+    
+    def flush_status_updates(self) -> Dict[int, bool]:
+        """
+        Send all queued status changes in one request.
+        
+        Example:
+        >>> for issue in resolved_issues:
+        ...     client.queue_status_update(issue.issue_id, "CLOSED")
+        >>> results = client.flush_status_updates()
+        """
+        
+        updates, self._pending_status_updates = self._pending_status_updates, []
+        return self.update_issue_statuses(updates)
     
     def summarize_conversation(self, conversation_id: int) -> Dict[str, Any]:
         """
@@ -174,14 +511,14 @@ class SupportCopilotClient:
         >>> print(f"Action Items: {summary['action_items']}")
         """
         
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/api/v1/conversations/{conversation_id}/summarize",
-            headers=self.headers,
+            headers=self._idempotency_headers(),
             timeout=15
         )
         
         if response.status_code == 200:
-            return response.json()
+            return _json_loads(response.content)
         else:
             raise Exception(f"API Error: {response.status_code} - {response.text}")
     
@@ -196,24 +533,188 @@ class SupportCopilotClient:
         >>> print(f"Critical Issues: {metrics['critical_issues']}")
         """
         
-        response = requests.get(
-            f"{self.base_url}/api/v1/metrics",
-            headers=self.headers,
-            timeout=15
-        )
+        return self._cached_get("/api/v1/metrics")
+    
+    def get_dashboard(self, customer_id: int) -> Dashboard:
+        """
+        Get critical issues, metrics and a customer's history in one request.
         
+        Falls back to the three separate endpoints against servers without
+        the dashboard endpoint.
+        
+        Example:
+        >>> dashboard = client.get_dashboard(customer_id=1)
+        >>> print(f"Critical Issues: {len(dashboard.critical_issues)}")
+        >>> print(f"Customer Issues: {dashboard.customer_history.total_issues}")
+        """
+        
+        try:
+            return self._cached_get(f"/api/v1/dashboard?customer_id={customer_id}", response_type=Dashboard)
+        except Exception as e:
+            if "API Error: 404" not in str(e):
+                raise
+        
+        return Dashboard(
+            critical_issues=self.get_critical_issues(),
+            metrics=self.get_performance_metrics(),
+            customer_history=self.get_customer_history(customer_id)
+        )
+
+class AsyncSupportCopilotClient:
+    """
+    Async client for the Support Copilot API.
+    
+    Mirrors SupportCopilotClient on httpx.AsyncClient, so independent calls
+    can run concurrently with asyncio.gather over one connection pool.
+    """
+    
+    def __init__(self, base_url: str, api_key: str):
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=15.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            http2=HTTP2_AVAILABLE
+        )
+        self._cache = _TTLCache()
+        self._etag_cache = _TTLCache(ttl=ETAG_CACHE_TTL)
+    
+    async def aclose(self):
+        """Close the pooled connections"""
+        await self.client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    def invalidate(self, path_prefix: str = ""):
+        """Drop cached GET responses whose path starts with path_prefix"""
+        self._cache.invalidate(path_prefix)
+    
+    @staticmethod
+    def _json(response: httpx.Response, response_type: Optional[type] = None) -> Any:
         if response.status_code == 200:
-            return response.json()
+            return _decode(response.content, response_type)
+        raise Exception(f"API Error: {response.status_code} - {response.text}")
+    
+    async def _cached_get(self, path: str, ttl: float = GET_CACHE_TTL, response_type: Optional[type] = None) -> Any:
+        """GET a read-only endpoint, answering repeats within ttl from memory"""
+        cached = self._cache.get(path)
+        if cached is not None:
+            return cached
+        validated = self._etag_cache.get(path)
+        headers = {"If-None-Match": validated[0]} if validated else None
+        response = await self.client.get(path, headers=headers)
+        if response.status_code == 304 and validated:
+            data = validated[1]
         else:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
+            data = self._json(response, response_type)
+            etag = response.headers.get("ETag")
+            if etag:
+                self._etag_cache.set(path, (etag, data))
+        self._cache.set(path, data, ttl)
+        return data
+    
+    async def analyze_new_issue(self, customer_id: int, title: str, description: str,
+                                category: str = None, priority: str = None) -> IssueAnalysis:
+        """Analyze a new support issue; see SupportCopilotClient.analyze_new_issue"""
+        payload = {
+            "customer_id": customer_id,
+            "title": title,
+            "description": description,
+            "category": category,
+            "priority": priority
+        }
+        response = await self.client.post("/api/v1/issues/analyze", content=_json_dumps(payload))
+        return self._json(response, IssueAnalysis)
+    
+    async def get_recommendations(self, issue_id: int, context: str,
+                                  message_type: str = "greeting", tone: str = "professional") -> RecommendationResponse:
+        """Get message recommendations; see SupportCopilotClient.get_recommendations"""
+        payload = {
+            "context": context,
+            "message_type": message_type,
+            "tone": tone
+        }
+        response = await self.client.post(f"/api/v1/issues/{issue_id}/recommend", content=_json_dumps(payload))
+        return self._json(response, RecommendationResponse)
+    
+    async def get_customer_history(self, customer_id: int) -> CustomerHistory:
+        """Get customer history; see SupportCopilotClient.get_customer_history"""
+        return await self._cached_get(f"/api/v1/customers/{customer_id}/history", response_type=CustomerHistory)
+    
+    async def get_customer_histories(self, customer_ids: List[int]) -> Dict[int, CustomerHistory]:
+        """Get several customers' history concurrently, at most ENRICH_CONCURRENCY at a time"""
+        semaphore = asyncio.Semaphore(ENRICH_CONCURRENCY)
+        
+        async def fetch(customer_id: int) -> CustomerHistory:
+            async with semaphore:
+                return await self.get_customer_history(customer_id)
+        
+        unique_ids = list(dict.fromkeys(customer_ids))
+        return dict(zip(unique_ids, await asyncio.gather(*(fetch(i) for i in unique_ids))))
+    
+    async def get_critical_issues(self) -> List[CriticalIssue]:
+        """Get critical issues; see SupportCopilotClient.get_critical_issues"""
+        return (await self._cached_get("/api/v1/issues/critical", response_type=CriticalIssuesResponse)).critical_issues
+    
+    async def update_issue_status(self, issue_id: int, new_status: str) -> bool:
+        """Update issue status; see SupportCopilotClient.update_issue_status"""
+        return (await self.update_issue_statuses([(issue_id, new_status)]))[issue_id]
+    
+    async def update_issue_statuses(self, updates: List[Tuple[int, str]]) -> Dict[int, bool]:
+        """Update several issue statuses in one request; see SupportCopilotClient.update_issue_statuses"""
+        if not updates:
+            return {}
+        response = await self.client.put(
+            "/api/v1/issues/status/batch",
+            content=_json_dumps({"updates": [{"issue_id": i, "status": s} for i, s in updates]}),
+            timeout=30.0
+        )
+        if response.status_code != 200:
+            return {issue_id: False for issue_id, _ in updates}
+        results = {row["issue_id"]: row["ok"] for row in _json_loads(response.content)["results"]}
+        if any(results.values()):
+            for path_prefix in STATUS_UPDATE_INVALIDATES:
+                self.invalidate(path_prefix)
+        return results
+    
+    async def summarize_conversation(self, conversation_id: int) -> Dict[str, Any]:
+        """Summarize a conversation; see SupportCopilotClient.summarize_conversation"""
+        return self._json(await self.client.post(f"/api/v1/conversations/{conversation_id}/summarize"))
+    
+    async def get_performance_metrics(self) -> Dict[str, Any]:
+        """Get performance metrics; see SupportCopilotClient.get_performance_metrics"""
+        return await self._cached_get("/api/v1/metrics")
+    
+    async def get_dashboard(self, customer_id: int) -> Dashboard:
+        """Get the dashboard in one request; see SupportCopilotClient.get_dashboard"""
+        try:
+            return await self._cached_get(f"/api/v1/dashboard?customer_id={customer_id}", response_type=Dashboard)
+        except Exception as e:
+            if "API Error: 404" not in str(e):
+                raise
+        critical_issues, metrics, customer_history = await asyncio.gather(
+            self.get_critical_issues(),
+            self.get_performance_metrics(),
+            self.get_customer_history(customer_id)
+        )
+        return Dashboard(critical_issues=critical_issues, metrics=metrics, customer_history=customer_history)
 
 # Example usage scenarios
-def example_issue_analysis():
+def _emit(lines: List[str]):
+    """Write an example's output in one call rather than one write per line"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+async def example_issue_analysis(client: AsyncSupportCopilotClient):
     """Example: Analyze a new critical issue"""
-    client = SupportCopilotClient(BASE_URL, API_KEY)
-    
     # Analyze new issue
-    analysis = client.analyze_new_issue(
+    analysis = await client.analyze_new_issue(
         customer_id=1,
         title="Payment processing error",
         description="Credit card payments are being declined incorrectly. This is affecting our business operations.",
@@ -221,147 +722,210 @@ def example_issue_analysis():
         priority="Critical"
     )
     
-    print("=== Issue Analysis ===")
-    print(f"Issue ID: {analysis['issue_id']}")
-    print(f"Severity: {analysis['severity_assessment']}")
-    print(f"Confidence: {analysis['confidence_score']:.2f}")
-    print(f"Processing Time: {analysis['processing_time']:.2f}s")
+    lines = []
+    lines.append("=== Issue Analysis ===")
+    lines.append(f"Issue ID: {analysis.issue_id}")
+    lines.append(f"Severity: {analysis.severity_assessment}")
+    lines.append(f"Confidence: {analysis.confidence_score:.2f}")
+    lines.append(f"Processing Time: {analysis.processing_time:.2f}s")
     
-    print("\nCustomer History:")
-    history = analysis['customer_history']
-    print(f"  Total Issues: {history['total_issues']}")
-    print(f"  VIP Status: {history['vip_status']}")
-    print(f"  Avg Resolution Time: {history['avg_resolution_time']}")
+    lines.append("\nCustomer History:")
+    history = analysis.customer_history
+    lines.append(f"  Total Issues: {history['total_issues']}")
+    lines.append(f"  VIP Status: {history['vip_status']}")
+    lines.append(f"  Avg Resolution Time: {history['avg_resolution_time']}")
     
-    print("\nSimilar Issues:")
-    for similar in analysis['similar_issues'][:3]:
-        print(f"  - Issue {similar['issue_id']}: {similar['similarity_score']:.2f} similarity")
+    lines.append("\nSimilar Issues:")
+    for similar in analysis.similar_issues[:3]:
+        lines.append(f"  - Issue {similar['issue_id']}: {similar['similarity_score']:.2f} similarity")
     
-    print("\nCritical Flags:")
-    for flag in analysis['critical_flags']:
-        print(f"  - {flag}")
+    lines.append("\nCritical Flags:")
+    for flag in analysis.critical_flags:
+        lines.append(f"  - {flag}")
     
-    print("\nRecommended Actions:")
-    for action in analysis['recommended_actions']:
-        print(f"  - {action}")
+    lines.append("\nRecommended Actions:")
+    for action in analysis.recommended_actions:
+        lines.append(f"  - {action}")
+    
+    _emit(lines)
 
-def example_recommendation_generation():
+async def example_recommendation_generation(client: AsyncSupportCopilotClient):
     """Example: Generate message recommendations"""
-    client = SupportCopilotClient(BASE_URL, API_KEY)
-    
     # Get recommendations for different message types
     issue_id = 123
     context = "Customer reported login authentication issues. They are a VIP customer."
     
-    # Greeting recommendation
-    greeting_recs = client.get_recommendations(
-        issue_id=issue_id,
-        context=context,
-        message_type="greeting",
-        tone="professional"
+    # Greeting and solution recommendations are independent; request both at once
+    greeting_recs, solution_recs = await asyncio.gather(
+        client.get_recommendations(
+            issue_id=issue_id,
+            context=context,
+            message_type="greeting",
+            tone="professional"
+        ),
+        client.get_recommendations(
+            issue_id=issue_id,
+            context=context,
+            message_type="solution",
+            tone="helpful"
+        )
     )
     
-    print("=== Greeting Recommendations ===")
-    for i, rec in enumerate(greeting_recs['recommendations'], 1):
-        print(f"{i}. {rec['template']}")
-        print(f"   Confidence: {rec['confidence_score']:.2f}")
-        print()
-    
-    # Solution recommendation
-    solution_recs = client.get_recommendations(
-        issue_id=issue_id,
-        context=context,
-        message_type="solution",
-        tone="helpful"
-    )
+    lines = []
+    lines.append("=== Greeting Recommendations ===")
+    for i, rec in enumerate(greeting_recs.recommendations, 1):
+        lines.append(f"{i}. {rec['template']}")
+        lines.append(f"   Confidence: {rec['confidence_score']:.2f}")
+        lines.append("")
     
-    print("=== Solution Recommendations ===")
-    for i, rec in enumerate(solution_recs['recommendations'], 1):
-        print(f"{i}. {rec['template']}")
-        print(f"   Confidence: {rec['confidence_score']:.2f}")
-        print()
+    lines.append("=== Solution Recommendations ===")
+    for i, rec in enumerate(solution_recs.recommendations, 1):
+        lines.append(f"{i}. {rec['template']}")
+        lines.append(f"   Confidence: {rec['confidence_score']:.2f}")
+        lines.append("")
+    
+    _emit(lines)
 
-def example_customer_analytics():
+async def example_customer_analytics(client: AsyncSupportCopilotClient):
     """Example: Customer history and analytics"""
-    client = SupportCopilotClient(BASE_URL, API_KEY)
-    
     # Get customer history
     customer_id = 1
-    history = client.get_customer_history(customer_id)
-    
-    print("=== Customer Analytics ===")
-    print(f"Customer ID: {history['customer_id']}")
-    print(f"Total Issues: {history['total_issues']}")
-    print(f"Resolved Issues: {history['resolved_issues']}")
-    print(f"Critical Issues: {history['critical_issues']}")
-    print(f"Avg Resolution Time: {history['avg_resolution_time']}")
-    print(f"Customer Satisfaction: {history['customer_satisfaction']}")
-    
-    print("\nRecent Issues:")
-    for issue in history['recent_issues'][:3]:
-        print(f"  - Issue {issue['issue_id']}: {issue['title']}")
-        print(f"    Status: {issue['status']}, Severity: {issue['severity']}")
-    
-    print("\nIssue Patterns:")
-    for pattern in history['issue_patterns']:
-        print(f"  - {pattern}")
-
-def example_critical_issues_monitoring():
+    history = await client.get_customer_history(customer_id)
+    
+    lines = []
+    lines.append("=== Customer Analytics ===")
+    lines.append(f"Customer ID: {history.customer_id}")
+    lines.append(f"Total Issues: {history.total_issues}")
+    lines.append(f"Resolved Issues: {history.resolved_issues}")
+    lines.append(f"Critical Issues: {history.critical_issues}")
+    lines.append(f"Avg Resolution Time: {history.avg_resolution_time}")
+    lines.append(f"Customer Satisfaction: {history.customer_satisfaction}")
+    
+    lines.append("\nRecent Issues:")
+    for issue in history.recent_issues[:3]:
+        lines.append(f"  - Issue {issue.issue_id}: {issue.title}")
+        lines.append(f"    Status: {issue.status}, Severity: {issue.severity}")
+    
+    lines.append("\nIssue Patterns:")
+    for pattern in history.issue_patterns:
+        lines.append(f"  - {pattern}")
+    
+    _emit(lines)
+
+async def example_critical_issues_monitoring(client: AsyncSupportCopilotClient):
     """Example: Monitor critical issues"""
-    client = SupportCopilotClient(BASE_URL, API_KEY)
-    
     # Get critical issues
-    critical_issues = client.get_critical_issues()
+    critical_issues = await client.get_critical_issues()
     
-    print("=== Critical Issues Alert ===")
-    print(f"Total Critical Issues: {len(critical_issues)}")
+    # Enrich with each customer's history in one concurrent batch rather
+    # than one request per issue in turn
+    histories = await client.get_customer_histories([i.customer_id for i in critical_issues])
+    
+    lines = []
+    lines.append("=== Critical Issues Alert ===")
+    lines.append(f"Total Critical Issues: {len(critical_issues)}")
     
     for issue in critical_issues:
-        print(f"\nIssue {issue['issue_id']}: {issue['title']}")
-        print(f"  Customer: {issue['customer_name']}")
-        print(f"  VIP Status: {issue['vip_status']}")
-        print(f"  Severity: {issue['severity']}")
-        print(f"  Status: {issue['status']}")
-        print(f"  Time Since Creation: {issue['time_since_creation']:.1f} hours")
+        lines.append(f"\nIssue {issue.issue_id}: {issue.title}")
+        lines.append(f"  Customer: {issue.customer_name}")
+        lines.append(f"  VIP Status: {issue.vip_status}")
+        lines.append(f"  Customer Issues (30d): {histories[issue.customer_id].total_issues}")
+        lines.append(f"  Severity: {issue.severity}")
+        lines.append(f"  Status: {issue.status}")
+        lines.append(f"  Time Since Creation: {issue.time_since_creation:.1f} hours")
         
-        if issue['vip_status']:
-            print("  ⚠️  VIP CUSTOMER - PRIORITY ESCALATION REQUIRED")
+        if issue.vip_status:
+            lines.append("  ⚠️  VIP CUSTOMER - PRIORITY ESCALATION REQUIRED")
+    
+    _emit(lines)
 
-def example_conversation_summarization():
+async def example_conversation_summarization(client: AsyncSupportCopilotClient):
     """Example: Conversation summarization"""
-    client = SupportCopilotClient(BASE_URL, API_KEY)
-    
     # Summarize conversation
     conversation_id = 456
-    summary = client.summarize_conversation(conversation_id)
+    summary = await client.summarize_conversation(conversation_id)
     
-    print("=== Conversation Summary ===")
-    print(f"Conversation ID: {summary['conversation_id']}")
-    print(f"Summary: {summary['summary']}")
-    print(f"Sentiment: {summary['sentiment']}")
-    print(f"Message Count: {summary['message_count']}")
+    lines = []
+    lines.append("=== Conversation Summary ===")
+    lines.append(f"Conversation ID: {summary['conversation_id']}")
+    lines.append(f"Summary: {summary['summary']}")
+    lines.append(f"Sentiment: {summary['sentiment']}")
+    lines.append(f"Message Count: {summary['message_count']}")
     
-    print("\nKey Points:")
+    lines.append("\nKey Points:")
     for point in summary['key_points']:
-        print(f"  - {point}")
+        lines.append(f"  - {point}")
     
-    print("\nAction Items:")
+    lines.append("\nAction Items:")
     for item in summary['action_items']:
-        print(f"  - {item}")
+        lines.append(f"  - {item}")
+    
+    _emit(lines)
 
-def example_performance_monitoring():
+async def example_performance_monitoring(client: AsyncSupportCopilotClient):
     """Example: System performance monitoring"""
-    client = SupportCopilotClient(BASE_URL, API_KEY)
-    
     # Get performance metrics
-    metrics = client.get_performance_metrics()
+    metrics = await client.get_performance_metrics()
+    
+    lines = []
+    lines.append("=== System Performance Metrics ===")
+    lines.append(f"API Response Time (Avg): {metrics['api_response_time_avg']:.2f}s")
+    lines.append(f"Active Issues: {metrics['active_issues']}")
+    lines.append(f"Resolved Today: {metrics['resolved_today']}")
+    lines.append(f"Critical Issues: {metrics['critical_issues']}")
+    lines.append(f"System Health: {metrics['system_health']}")
+    
+    _emit(lines)
+
+async def example_dashboard(client: AsyncSupportCopilotClient):
+    """Example: Load a support dashboard in one request"""
+    dashboard = await client.get_dashboard(customer_id=1)
+    
+    lines = []
+    lines.append("=== Support Dashboard ===")
+    lines.append(f"System Health: {dashboard.metrics['system_health']}")
+    lines.append(f"Active Issues: {dashboard.metrics['active_issues']}")
+    lines.append(f"Critical Issues: {len(dashboard.critical_issues)}")
+    lines.append(f"VIP Critical Issues: {sum(1 for issue in dashboard.critical_issues if issue.vip_status)}")
+    
+    history = dashboard.customer_history
+    lines.append(f"\nCustomer {history.customer_id}:")
+    lines.append(f"  Total Issues: {history.total_issues}")
+    lines.append(f"  Avg Resolution Time: {history.avg_resolution_time}")
+    
+    _emit(lines)
+
+EXAMPLES = [
+    example_issue_analysis,
+    example_recommendation_generation,
+    example_customer_analytics,
+    example_critical_issues_monitoring,
+    example_conversation_summarization,
+    example_performance_monitoring,
+    example_dashboard
+]
+
+async def main() -> int:
+    """
+    Run all examples concurrently over one client.
+    
+    Each example prints its whole section after its last response arrives,
+    so sections never interleave. A failing example is reported on its own
+    without cancelling the others.
+    
+    Returns:
+        Number of examples that failed
+    """
+    async with AsyncSupportCopilotClient(BASE_URL, API_KEY) as client:
+        results = await asyncio.gather(
+            *(example(client) for example in EXAMPLES),
+            return_exceptions=True
+        )
     
-    print("=== System Performance Metrics ===")
-    print(f"API Response Time (Avg): {metrics['api_response_time_avg']:.2f}s")
-    print(f"Active Issues: {metrics['active_issues']}")
-    print(f"Resolved Today: {metrics['resolved_today']}")
-    print(f"Critical Issues: {metrics['critical_issues']}")
-    print(f"System Health: {metrics['system_health']}")
+    failures = [(example, result) for example, result in zip(EXAMPLES, results) if isinstance(result, Exception)]
+    for example, error in failures:
+        print(f"\n{example.__name__} failed: {str(error)}")
+    return len(failures)
 
 # Main execution
 if __name__ == "__main__":
@@ -369,24 +933,10 @@ if __name__ == "__main__":
     print("=" * 50)
     
     try:
-        # Run examples
-        example_issue_analysis()
-        print("\n" + "=" * 50)
-        
-        example_recommendation_generation()
-        print("\n" + "=" * 50)
-        
-        example_customer_analytics()
-        print("\n" + "=" * 50)
-        
-        example_critical_issues_monitoring()
-        print("\n" + "=" * 50)
-        
-        example_conversation_summarization()
-        print("\n" + "=" * 50)
-        
-        example_performance_monitoring()
+        # Each example prints its section once its responses arrive
+        if asyncio.run(main()):
+            print("Make sure the Support Copilot API is running on localhost:8000")
         
     except Exception as e:
         print(f"Error running examples: {str(e)}")
-        print("Make sure the Support Copilot API is running on localhost:8000") 
\ No newline at end of file
+        print("Make sure the Support Copilot API is running on localhost:8000")
\ No newline at end of file
@@ -33,9 +33,9 @@ CREATE TABLE IF NOT EXISTS issues (
     resolved_at TIMESTAMP NULL,
     resolution_time DECIMAL(10, 2),
     ai_confidence_score DECIMAL(3, 2),
+    is_open BOOLEAN AS (status IN ('OPEN', 'IN_PROGRESS')) STORED,
     FOREIGN KEY (customer_id) REFERENCES customers(id),
-    INDEX idx_customer_id (customer_id),
-    INDEX idx_status (status),
+    INDEX idx_customer_created (customer_id, created_at),
     INDEX idx_severity (severity),
     INDEX idx_created_at (created_at)
 );
@@ -98,6 +98,18 @@ CREATE TABLE IF NOT EXISTS similar_issues (
     INDEX idx_similarity_score (similarity_score)
 );
 
+-- Create customer_stats_30d table (rolling 30-day aggregates per customer)
+CREATE TABLE IF NOT EXISTS customer_stats_30d (
+    customer_id BIGINT PRIMARY KEY,
+    total_issues INT NOT NULL DEFAULT 0,
+    resolved_issues INT NOT NULL DEFAULT 0,
+    critical_issues INT NOT NULL DEFAULT 0,
+    avg_resolution_time DECIMAL(10,2),
+    refreshed_at TIMESTAMP NOT NULL,
+    FOREIGN KEY (customer_id) REFERENCES customers(id),
+    INDEX idx_refreshed_at (refreshed_at)
+);
+
 -- Create users table
 CREATE TABLE IF NOT EXISTS users (
     id BIGINT AUTO_INCREMENT PRIMARY KEY,
@@ -107,9 +119,7 @@ CREATE TABLE IF NOT EXISTS users (
     role VARCHAR(50) DEFAULT 'support_executive',
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    last_login TIMESTAMP NULL,
-    INDEX idx_username (username),
-    INDEX idx_email (email)
+    last_login TIMESTAMP NULL
 );
 
 -- Create audit_logs table
@@ -184,6 +194,12 @@ CREATE INDEX idx_issues_status_created ON issues(status, created_at);
 CREATE INDEX idx_conversations_issue_sender ON conversations(issue_id, sender_type);
 CREATE INDEX idx_recommendations_issue_type ON recommendations(issue_id, message_type);
 CREATE INDEX idx_audit_logs_user_action ON audit_logs(user_id, action);
+CREATE INDEX ix_issue_status_sev_created ON issues(status, severity, created_at);
+CREATE INDEX ix_open_critical ON issues(is_open, severity, created_at);
+CREATE INDEX ix_conv_issue_created ON conversations(issue_id, created_at);
+CREATE INDEX ix_rec_issue_conf ON recommendations(issue_id, confidence_score DESC);
+CREATE INDEX ix_rec_issue_created ON recommendations(issue_id, created_at DESC);
+CREATE INDEX ix_rec_used ON recommendations(used_count DESC);
 
 -- Create views for common queries
 CREATE VIEW issue_summary AS